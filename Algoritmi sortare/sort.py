@@ -1,7 +1,12 @@
+import heapq
 import random
 import time
+
 import numpy as np
 
+# Rulări neînregistrate ale fiecărui algoritm înainte de măsurare
+WARMUP_RUNS = 1
+
 
 # Generare 1.000 de liste cu dimensiuni aleatorii între 10.000 și 100.000
 def generate_integer_lists(num_lists):
@@ -93,25 +98,6 @@ def heap_sort(arr):
         heapify(arr, i, 0)
 
 
-# Compararea performanței
-def benchmark_sorting_algorithms(lists, algorithms):
-    results = {alg.__name__: [] for alg in algorithms}
-   
-    for alg in algorithms:
-        print(alg)
-        for lst in lists:
-            lst_copy = lst[:]  # Copie pentru a păstra lista inițială
-            start_time = time.time()
-            if alg.__name__ == "quick_sort":
-                sorted_lst = alg(lst_copy)  # Quick Sort returnează o listă nouă
-            else:
-                
-                alg(lst_copy)  # Alți algoritmi sortează în loc
-            end_time = time.time()
-            results[alg.__name__].append(end_time - start_time)
-    
-    return results
-
 def counting_sort(arr, max_value=None):
     """Counting sort for non-negative integers."""
     if max_value is None:
@@ -176,13 +162,147 @@ def counting_sort_radix(arr, exp):
     # Copy sorted array back to original
     for i in range(n):
         arr[i] = output[i]
-# Generare și benchmark
-nr_liste = 100 # Începe cu 10 liste pentru testare; extinde la 1.000 ulterior
-lists = generate_integer_lists(nr_liste)
 
-algorithms = [counting_sort, radix_sort, merge_sort, quick_sort, heap_sort]
-results = benchmark_sorting_algorithms(lists, algorithms)
 
-# Calculare medii și afișare rezultate
-for alg, times in results.items():
-    print(f"{alg}: Average time = {np.mean(times):.4f} seconds")
+# Variante NumPy pe tablouri int32. Toți algoritmii din benchmark respectă același contract:
+# primesc datele și le sortează pe loc, fără să returneze nimic.
+
+# Counting sort: frecvențele cu np.bincount, apoi fiecare valoare repetată de câte ori apare
+def counting_sort_np(arr):
+    if len(arr) == 0:
+        return
+    low = int(arr.min())
+    counts = np.bincount(arr.astype(np.int64) - low)
+    arr[:] = np.repeat(np.arange(low, low + len(counts), dtype=arr.dtype), counts)
+
+
+# Radix sort LSD în baza 2^bits (8 sau 16 biți pe cifră). Cheile sunt valorile int32 văzute
+# ca uint32 cu bitul de semn inversat, deci și numerele negative ies în ordine. La fiecare
+# trecere np.bincount numără cifrele și o trecere în care toate cheile au aceeași cifră este
+# sărită. Împrăștierea stabilă în găleți (numărare + sume cumulate) o face argsort-ul stabil
+# pe cifre uint8/uint16, pe care NumPy îl implementează exact așa, în C.
+def radix_sort_np(arr, bits=8):
+    n = len(arr)
+    if n == 0:
+        return
+    digit_type = np.uint8 if bits == 8 else np.uint16
+    keys = arr.view(np.uint32) ^ np.uint32(1 << 31)
+    for shift in range(0, 32, bits):
+        digits = ((keys >> shift) & ((1 << bits) - 1)).astype(digit_type)
+        counts = np.bincount(digits, minlength=1 << bits)
+        if counts.max() == n:
+            continue
+        keys = keys[np.argsort(digits, kind='stable')]
+    arr[:] = (keys ^ np.uint32(1 << 31)).view(np.int32)
+
+
+def radix_sort_np16(arr):
+    radix_sort_np(arr, bits=16)
+
+
+# Merge sort de jos în sus: la fiecare nivel toate perechile de secvențe sortate de lungime
+# `width` sunt interclasate deodată. Fiecare cheie primește în biții de sus numărul perechii,
+# deci secvențele din stânga (și cele din dreapta) formează un singur tablou sortat; poziția
+# finală a unui element este indicele lui plus câte elemente din celălalt tablou îl preced
+# (np.searchsorted, "right" pentru dreapta ca sortarea să rămână stabilă).
+def merge_sort_np(arr):
+    n = len(arr)
+    keys = arr.astype(np.int64) + (1 << 31)
+    index = np.arange(n)
+    width = 1
+    while width < n:
+        tagged = (index // (2 * width) << 32) | keys
+        from_left = index % (2 * width) < width
+        left, right = tagged[from_left], tagged[~from_left]
+        merged = np.empty_like(tagged)
+        merged[np.arange(len(left)) + np.searchsorted(right, left, 'left')] = left
+        merged[np.arange(len(right)) + np.searchsorted(left, right, 'right')] = right
+        keys = merged & 0xFFFFFFFF
+        width *= 2
+    arr[:] = keys - (1 << 31)
+
+
+# Heap sort: heap-ul este construit și golit de heapq (în C), iar rezultatul scris înapoi
+# în tablou. Extragerile sunt secvențiale prin natura algoritmului, deci nu se vectorizează.
+def heap_sort_np(arr):
+    heap = arr.tolist()
+    heapq.heapify(heap)
+    arr[:] = [heapq.heappop(heap) for _ in range(len(heap))]
+
+
+# Referințele: sortările din NumPy, pe loc
+def np_quicksort(arr):
+    arr.sort(kind='quicksort')
+
+
+def np_mergesort(arr):
+    arr.sort(kind='stable')
+
+
+def np_heapsort(arr):
+    arr.sort(kind='heapsort')
+
+
+# Quick sort returnează o listă nouă; varianta aceasta o scrie înapoi, ca restul algoritmilor
+def quick_sort_in_place(arr):
+    arr[:] = quick_sort(arr)
+
+
+# Algoritmii care primesc un tablou int32; ceilalți primesc o listă Python
+ARRAY_ALGORITHMS = (counting_sort_np, radix_sort_np, radix_sort_np16, merge_sort_np, heap_sort_np,
+                    np_quicksort, np_mergesort, np_heapsort)
+PYTHON_ALGORITHMS = (counting_sort, radix_sort, merge_sort, quick_sort_in_place, heap_sort)
+
+
+# Generare liste ca tablouri int32, cu aceleași dimensiuni și valori ca generate_integer_lists
+def generate_integer_arrays(num_lists, seed=None):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 1_000_000, size=rng.integers(10_000, 100_000), endpoint=True, dtype=np.int32)
+            for _ in range(num_lists)]
+
+
+# Compararea performanței. Fiecare algoritm sortează pe loc o copie a fiecărei liste (tablou
+# int32 sau listă Python, pregătită în afara măsurării), după WARMUP_RUNS rulări de încălzire
+# pe prima listă. Timpul este măsurat cu perf_counter, iar rezultatul este verificat.
+# Returnează, pentru fiecare algoritm, timpii și debitul total în elemente pe secundă.
+def benchmark_sorting_algorithms(arrays, algorithms, warmup=WARMUP_RUNS):
+    expected = [np.sort(arr) for arr in arrays]
+    results = {}
+    for alg in algorithms:
+        def prepare(arr):
+            return arr.copy() if alg in ARRAY_ALGORITHMS else arr.tolist()
+
+        for _ in range(warmup):
+            alg(prepare(arrays[0]))
+
+        times = []
+        for arr, sorted_arr in zip(arrays, expected):
+            data = prepare(arr)
+            start_time = time.perf_counter()
+            alg(data)
+            times.append(time.perf_counter() - start_time)
+            if not np.array_equal(data, sorted_arr):
+                raise AssertionError(f"{alg.__name__} nu a sortat corect o listă de {len(arr)} elemente.")
+        elements = sum(len(arr) for arr in arrays)
+        results[alg.__name__] = {'times': times, 'elements_per_second': elements / sum(times)}
+    return results
+
+
+# Generare și benchmark. Variantele Python pure sunt incluse doar la cerere: pe liste de
+# 10.000 - 100.000 de elemente durează minute întregi.
+def main(nr_liste=100, include_python=False, seed=None):
+    arrays = generate_integer_arrays(nr_liste, seed)
+
+    algorithms = list(ARRAY_ALGORITHMS)
+    if include_python:
+        algorithms += PYTHON_ALGORITHMS
+    results = benchmark_sorting_algorithms(arrays, algorithms)
+
+    # Calculare medii și afișare rezultate
+    for alg, result in results.items():
+        print(f"{alg}: Average time = {np.mean(result['times']):.4f} seconds, "
+              f"{result['elements_per_second']:,.0f} elements/s")
+
+
+if __name__ == '__main__':
+    main()
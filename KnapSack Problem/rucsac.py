@@ -1,4 +1,5 @@
 import random
+from collections import OrderedDict
 from typing import List
 
 # Clasa Item definește un obiect cu un nume, greutate și valoare
@@ -13,15 +14,30 @@ class Item:
 class Individual:
     def __init__(self, bits: List[int]):
         self.bits = bits  # Configurația de 0 și 1 care determină selecția obiectelor
+        self._genome = None  # Cheia din cache, calculată la prima cerere
     
     def __str__(self):
         return repr(self.bits)  # Reprezentare în format text a soluției
 
+    def __eq__(self, other):
+        return isinstance(other, Individual) and self.bits == other.bits
+
     def __hash__(self):
-        return hash(str(self.bits))  # Hash pentru utilizarea în structuri de date, ex. set
-    
-    # Funcția fitness calculează valoarea totală a soluției dacă greutatea este sub limita admisă
+        return hash(self.genome())  # Hash pentru utilizarea în structuri de date, ex. set
+
+    # Genomul ca șir de octeți (octetul i = bitul obiectului i), cheia din cache.
+    # Este calculat o singură dată; mutate() îl resetează după ce inversează biți.
+    def genome(self) -> bytes:
+        if self._genome is None:
+            self._genome = bytes(self.bits)
+        return self._genome
+
+    # Funcția fitness calculează valoarea totală a soluției dacă greutatea este sub limita admisă.
+    # Rezultatul depinde doar de biți, obiecte și capacitate, deci este memorat în fitness_cache.
     def fitness(self) -> float:
+        return fitness_cache.lookup(self.genome(), self._compute_fitness)
+
+    def _compute_fitness(self) -> float:
         total_value = sum([
             bit * item.value
             for item, bit in zip(items, self.bits)  # Valoarea obiectelor selectate
@@ -38,11 +54,52 @@ class Individual:
         return 0  # Returnează 0 dacă soluția depășește greutatea maximă
 
 
+# Cache LRU mărginit pentru fitness, indexat după genomul împachetat.
+# Reține cel mult `maxsize` valori și le elimină pe cele folosite cel mai demult.
+# Se golește singur când set_problem schimbă problema (contorul problem_version); după o
+# modificare pe loc sau o atribuire directă a obiectelor trebuie apelat clear().
+class FitnessCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._problem = None
+
+    def lookup(self, key, compute):
+        if problem_version != self._problem:
+            self.clear()
+            self._problem = problem_version
+        if key in self._values:
+            self.hits += 1
+            self._values.move_to_end(key)
+            return self._values[key]
+        self.misses += 1
+        value = compute()
+        self._values[key] = value
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)  # Eliminăm intrarea folosită cel mai demult
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._values),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
 # Constantele problemei: greutatea maximă a rucsacului și ratele pentru operațiile genetice
 MAX_KNAPSACK_WEIGHT = 15
 CROSSOVER_RATE = 0.53
 MUTATION_RATE = 0.013
 REPRODUCTION_RATE = 0.15
+FITNESS_CACHE_SIZE = 1024
 
 # Lista obiectelor care pot fi selectate pentru rucsac
 items = [
@@ -52,6 +109,17 @@ items = [
     Item("D", 9, 2)
 ]
 
+fitness_cache = FitnessCache(FITNESS_CACHE_SIZE)
+problem_version = 0  # Crește la fiecare set_problem
+
+
+# Înlocuiește obiectele și capacitatea rucsacului; valorile din cache devin invalide
+def set_problem(new_items: List[Item], max_weight):
+    global items, MAX_KNAPSACK_WEIGHT, problem_version
+    items = new_items
+    MAX_KNAPSACK_WEIGHT = max_weight
+    problem_version += 1
+
 # Funcția pentru generarea populației inițiale
 def generate_initial_population(count=6) -> List[Individual]:
     population = set()  # Utilizăm un set pentru a evita duplicatele
@@ -105,7 +173,8 @@ def mutate(individuals: List[Individual]) -> List[Individual]:
     for individual in individuals:
         for i in range(len(individual.bits)):
             if random.random() < MUTATION_RATE:  # Cu o probabilitate MUTATION_RATE
-                individual.bits[i] = ~individual.bits[i]  # Inversăm bitul
+                individual.bits[i] = 1 - individual.bits[i]  # Inversăm bitul
+        individual._genome = None  # Biții s-au putut schimba
 
 
 # Funcția pentru generarea următoarei generații
@@ -167,3 +236,4 @@ def solve_knapsack() -> Individual:
 if __name__ == '__main__':
     solution = solve_knapsack()
     print(solution, solution.fitness())  # Afișăm soluția finală și fitness-ul său
+    print("Fitness cache", fitness_cache.stats())
@@ -0,0 +1,172 @@
+import bisect
+import time
+
+import numpy as np
+
+from rucsac import MAX_KNAPSACK_WEIGHT, items
+from rucsac_numpy import solve_knapsack as solve_knapsack_ga
+
+# Limitele până la care dispecerul alege programarea dinamică: numărul de celule
+# n_items x (capacitate + 1) actualizate, care dă timpul și memoria biților de
+# reconstrucție (DP_MAX_CELLS / 8 octeți), și capacitatea, care dă memoria vectorului
+# best și a temporarelor lui (câte 8 octeți pe unitate de capacitate)
+DP_MAX_CELLS = 200_000_000
+DP_MAX_CAPACITY = 4_000_000
+
+
+# Greutățile și valorile unei liste de obiecte Item ca tablouri NumPy
+def item_arrays(item_list):
+    weights = np.array([item.weight for item in item_list], dtype=np.int64)
+    values = np.array([item.value for item in item_list], dtype=np.int64)
+    return weights, values
+
+
+# Programare dinamică 1-D peste capacitate: best[c] = valoarea maximă cu greutatea cel mult c.
+# Fiecare obiect actualizează tot vectorul într-o singură operație NumPy (partea dreaptă
+# este calculată din vectorul vechi, deci obiectul este folosit o singură dată).
+# Cu `reconstruct=True` se păstrează, pentru fiecare obiect, un bitset împachetat cu
+# capacitățile la care obiectul a fost luat (n_items x capacitate / 8 octeți); altfel doar
+# vectorul best, de capacitate + 1 valori.
+# Returnează (valoarea optimă, indicii obiectelor alese sau None).
+def dp_knapsack(weights, values, capacity, reconstruct=True):
+    weights = np.asarray(weights, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    best = np.zeros(capacity + 1, dtype=np.int64)
+    taken = []
+    for weight, value in zip(weights.tolist(), values.tolist()):
+        if weight > capacity:
+            taken.append(None)
+            continue
+        candidate = best[:capacity + 1 - weight] + value
+        improved = candidate > best[weight:]
+        best[weight:] = np.where(improved, candidate, best[weight:])
+        if reconstruct:
+            taken.append(np.packbits(improved))
+
+    if not reconstruct:
+        return best[capacity].item(), None
+
+    # Mergem înapoi prin obiecte: obiectul i a fost luat la capacitatea c dacă bitul c - w este 1
+    chosen = []
+    c = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        bits, weight = taken[i], weights[i].item()
+        if bits is None or c < weight:
+            continue
+        k = c - weight
+        if bits[k >> 3] >> (7 - (k & 7)) & 1:
+            chosen.append(i)
+            c -= weight
+    return best[capacity].item(), sorted(chosen)
+
+
+# Branch-and-bound în adâncime peste obiectele sortate descrescător după valoare/greutate.
+# Marginea unui nod este relaxarea fracționară: umplem capacitatea rămasă cu obiectele
+# următoare în ordine, ultimul luat parțial (sume prefix și căutare binară, O(log n)).
+# Ramura "iau obiectul" este explorată prima; o ramură cu marginea nu peste cea mai bună
+# soluție găsită este tăiată. Soluția greedy dă valoarea de pornire.
+# Returnează (valoarea optimă, indicii obiectelor alese, nodurile explorate).
+def branch_and_bound(weights, values, capacity):
+    weights = np.asarray(weights, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    with np.errstate(divide='ignore'):
+        ratio = np.where(weights > 0, values / np.maximum(weights, 1), np.inf)
+    order = np.argsort(-ratio, kind='stable')
+    w = weights[order].tolist()
+    v = values[order].tolist()
+    n = len(w)
+    prefix_w = [0] * (n + 1)
+    prefix_v = [0] * (n + 1)
+    for k in range(n):
+        prefix_w[k + 1] = prefix_w[k] + w[k]
+        prefix_v[k + 1] = prefix_v[k] + v[k]
+
+    def bound(k, room, value):
+        j = bisect.bisect_right(prefix_w, prefix_w[k] + room, k) - 1
+        result = value + prefix_v[j] - prefix_v[k]
+        if j < n:
+            result += (room - (prefix_w[j] - prefix_w[k])) * v[j] / w[j]
+        return result
+
+    # Soluția greedy: luăm în ordine tot ce încape
+    best_value, best_chosen, room = 0, None, capacity
+    for k in range(n):
+        if w[k] <= room:
+            room -= w[k]
+            best_value += v[k]
+            best_chosen = (k, best_chosen)
+
+    nodes = 0
+    # Nod: (următorul obiect, capacitatea rămasă, valoarea, obiectele alese ca listă înlănțuită)
+    stack = [(0, capacity, 0, None)]
+    while stack:
+        k, room, value, chosen = stack.pop()
+        nodes += 1
+        if value > best_value:
+            best_value, best_chosen = value, chosen
+        if k == n or bound(k, room, value) <= best_value:
+            continue
+        stack.append((k + 1, room, value, chosen))  # Fără obiectul k
+        if w[k] <= room:
+            stack.append((k + 1, room - w[k], value + v[k], (k, chosen)))  # Cu obiectul k, explorat primul
+
+    result = []
+    while best_chosen is not None:
+        k, best_chosen = best_chosen
+        result.append(order[k].item())
+    return best_value, sorted(result), nodes
+
+
+# Alege motorul exact după numărul de obiecte și capacitate: programarea dinamică dacă
+# n_items x capacitate și capacitatea rămân sub limite, altfel branch-and-bound.
+# Returnează (valoarea optimă, indicii obiectelor alese, motorul folosit).
+def solve_exact(weights, values, capacity):
+    if capacity <= DP_MAX_CAPACITY and len(weights) * (capacity + 1) <= DP_MAX_CELLS:
+        value, chosen = dp_knapsack(weights, values, capacity)
+        return value, chosen, 'dp'
+    value, chosen, _ = branch_and_bound(weights, values, capacity)
+    return value, chosen, 'branch-and-bound'
+
+
+# Compară motoarele exacte cu algoritmul genetic pe instanțe aleatoare (semănate):
+# timpul fiecăruia și cât de departe de optim ajunge GA-ul
+def benchmark(sizes=((50, 1000), (200, 10_000), (1000, 50_000), (2000, 100_000)), generations=200,
+              pop_size=1000, seed=0):
+    rows = []
+    for n_items, capacity in sizes:
+        rng = np.random.default_rng([seed, n_items, capacity])
+        weights = rng.integers(1, 2 * capacity // n_items + 2, size=n_items)
+        values = rng.integers(1, 100, size=n_items)
+
+        start_time = time.perf_counter()
+        dp_value, _ = dp_knapsack(weights, values, capacity)
+        dp_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        bb_value, _, nodes = branch_and_bound(weights, values, capacity)
+        bb_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        _, ga_value, _ = solve_knapsack_ga(weights, values, capacity, pop_size, generations, seed)
+        ga_time = time.perf_counter() - start_time
+
+        if dp_value != bb_value:
+            raise AssertionError(f"DP ({dp_value}) și branch-and-bound ({bb_value}) nu coincid.")
+        rows.append({
+            'n_items': n_items, 'capacity': capacity, 'optimum': dp_value,
+            'dp_s': dp_time, 'bb_s': bb_time, 'bb_nodes': nodes,
+            'ga_s': ga_time, 'ga_value': int(ga_value), 'ga_gap': 1 - ga_value / dp_value,
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    # Problema din rucsac.py
+    weights, values = item_arrays(items)
+    value, chosen, engine = solve_exact(weights, values, MAX_KNAPSACK_WEIGHT)
+    print([items[i].name for i in chosen], value, f"({engine})")
+
+    for row in benchmark():
+        print(f"{row['n_items']:>5} obiecte, capacitate {row['capacity']:>7}: optim {row['optimum']:>7}  "
+              f"DP {row['dp_s']:7.3f}s  B&B {row['bb_s']:7.3f}s ({row['bb_nodes']} noduri)  "
+              f"GA {row['ga_s']:7.3f}s ({row['ga_value']}, {row['ga_gap']:.1%} sub optim)")
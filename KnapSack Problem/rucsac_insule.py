@@ -0,0 +1,158 @@
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from rucsac import MAX_KNAPSACK_WEIGHT, items
+from rucsac_numpy import evaluate, generate_population, item_matrix, next_generation
+
+# Parametrii modelului cu insule
+MIGRATION_INTERVAL = 10  # Generații între două migrații
+MIGRANTS = 5  # Cei mai buni indivizi trimiși de fiecare insulă la o migrație
+PATIENCE = 50  # Generații fără nicio îmbunătățire după care ne oprim
+MAX_GENERATIONS = 500
+
+
+# Un tablou NumPy într-un bloc de memorie partajată; procesele îl deschid după nume
+def _shared_array(shape, dtype, name=None):
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    block = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Procesul unei insule. La fiecare epocă insula evoluează `interval` generații, își
+# scrie cei mai buni indivizi în memoria partajată și așteaptă la barieră celelalte
+# insule și decizia procesului principal. Dacă nu trebuie să se oprească, primește
+# migranții insulei vecine (inel: k primește de la k - 1) în locul celor mai slabi
+# indivizi. Migranții sunt scriși alternativ în două zone (după paritatea epocii), ca
+# o insulă rapidă să nu suprascrie migranții pe care vecina încă îi citește.
+def _island(k, names, shapes, weights, values, max_weight, pop_size, interval, migrants, seed, barrier):
+    try:
+        _evolve_island(k, names, shapes, weights, values, max_weight, pop_size, interval, migrants, seed, barrier)
+    except BaseException:
+        barrier.abort()  # Celelalte procese nu mai așteaptă la barieră o insulă căzută
+        raise
+
+
+def _evolve_island(k, names, shapes, weights, values, max_weight, pop_size, interval, migrants, seed, barrier):
+    blocks, arrays = zip(*(_shared_array(shapes[key], dtype, names[key])
+                           for key, dtype in (('migrants', np.uint8), ('best_bits', np.uint8),
+                                              ('best_fitness', np.float64), ('stop', np.uint8))))
+    shared_migrants, best_bits, best_fitness, stop = arrays
+    islands = len(best_fitness)
+
+    rng = np.random.default_rng(seed)
+    matrix = item_matrix(weights, values)
+    population = generate_population(rng, pop_size, len(weights))
+    fitness = evaluate(population, matrix, max_weight)
+    epoch = 0
+    while True:
+        for _ in range(interval):
+            population = next_generation(rng, population, fitness)
+            fitness = evaluate(population, matrix, max_weight)
+            best = int(np.argmax(fitness))
+            if fitness[best] > best_fitness[k]:
+                best_fitness[k] = fitness[best]
+                best_bits[k] = population[best]
+
+        slot = epoch % 2
+        top = np.argpartition(-fitness, migrants - 1)[:migrants]
+        shared_migrants[slot, k] = population[top]
+        barrier.wait()  # Toate insulele și-au scris migranții
+        barrier.wait()  # Procesul principal a decis dacă ne oprim
+        if stop[0]:
+            break
+
+        worst = np.argpartition(fitness, migrants - 1)[:migrants]
+        population[worst] = shared_migrants[slot, (k - 1) % islands]
+        fitness[worst] = evaluate(population[worst], matrix, max_weight)
+        epoch += 1
+
+    del shared_migrants, best_bits, best_fitness, stop, arrays
+    for block in blocks:
+        block.close()
+
+
+# Algoritmul genetic cu insule: `islands` populații independente, fiecare în procesul
+# ei și cu sămânța ei, care schimbă cei mai buni indivizi la fiecare `interval`
+# generații prin memorie partajată. Ne oprim când nicio insulă nu și-a îmbunătățit
+# cel mai bun individ în ultimele `patience` generații sau după `max_generations`.
+# Returnează (biții celui mai bun individ, fitness-ul său, generațiile rulate).
+def solve_knapsack_islands(weights, values, max_weight, islands=None, pop_size=1000, interval=MIGRATION_INTERVAL,
+                           migrants=MIGRANTS, patience=PATIENCE, max_generations=MAX_GENERATIONS, seed=None):
+    islands = islands or os.cpu_count()
+    n_items = len(weights)
+    migrants = min(migrants, pop_size)
+    shapes = {
+        'migrants': (2, islands, migrants, n_items),
+        'best_bits': (islands, n_items),
+        'best_fitness': (islands,),
+        'stop': (1,),
+    }
+    dtypes = {'migrants': np.uint8, 'best_bits': np.uint8, 'best_fitness': np.float64, 'stop': np.uint8}
+    blocks, arrays = {}, {}
+    for key, shape in shapes.items():
+        blocks[key], arrays[key] = _shared_array(shape, dtypes[key])
+        arrays[key][...] = 0
+    arrays['best_fitness'][:] = -1
+    names = {key: block.name for key, block in blocks.items()}
+
+    context = mp.get_context()
+    barrier = context.Barrier(islands + 1)
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+    processes = [
+        context.Process(target=_island, args=(k, names, shapes, np.asarray(weights), np.asarray(values), max_weight,
+                                              pop_size, interval, migrants, seeds[k], barrier))
+        for k in range(islands)
+    ]
+    try:
+        for process in processes:
+            process.start()
+
+        best_so_far = -1.0
+        last_improvement = generations = 0
+        while True:
+            barrier.wait()
+            generations += interval
+            current = arrays['best_fitness'].max()
+            if current > best_so_far:
+                best_so_far = current
+                last_improvement = generations
+            if generations - last_improvement >= patience or generations >= max_generations:
+                arrays['stop'][0] = 1
+            barrier.wait()
+            if arrays['stop'][0]:
+                break
+
+        for process in processes:
+            process.join()
+        best = int(np.argmax(arrays['best_fitness']))
+        return arrays['best_bits'][best].copy(), arrays['best_fitness'][best].item(), generations
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        arrays.clear()
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+if __name__ == '__main__':
+    # Problema din rucsac.py, pe 2 insule
+    weights = [item.weight for item in items]
+    values = [item.value for item in items]
+    bits, best_fitness, generations = solve_knapsack_islands(weights, values, MAX_KNAPSACK_WEIGHT, islands=2,
+                                                             pop_size=6, migrants=1, seed=0)
+    print(bits.tolist(), best_fitness, f"({generations} generații)")
+
+    # O instanță aleatoare mare, câte o insulă pe fiecare nucleu
+    rng = np.random.default_rng(0)
+    weights = rng.integers(1, 100, size=2000)
+    values = rng.integers(1, 100, size=2000)
+    start_time = time.perf_counter()
+    bits, best_fitness, generations = solve_knapsack_islands(weights, values, weights.sum() // 2, seed=0)
+    print(f"2000 obiecte, {os.cpu_count()} insule: fitness = {best_fitness}, {generations} generații, "
+          f"timp = {time.perf_counter() - start_time:.2f}s")
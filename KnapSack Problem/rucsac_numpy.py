@@ -0,0 +1,121 @@
+import time
+
+import numpy as np
+
+from rucsac import CROSSOVER_RATE, MAX_KNAPSACK_WEIGHT, MUTATION_RATE, REPRODUCTION_RATE, items
+
+# Numărul de indivizi evaluați odată: limitează memoria temporară a produsului matrice-vector
+FITNESS_BLOCK = 4096
+
+
+# Greutățile și valorile obiectelor ca o matrice (n_items, 2), folosită la evaluarea populației
+def item_matrix(weights, values) -> np.ndarray:
+    return np.column_stack((weights, values)).astype(np.float64)
+
+
+# Populația inițială: o matrice (pop_size, n_items) de 0 și 1 stocată ca uint8
+def generate_population(rng, pop_size, n_items) -> np.ndarray:
+    return rng.integers(0, 2, size=(pop_size, n_items), dtype=np.uint8)
+
+
+# Fitness-ul întregii populații: un singur produs matrice-vector dă greutatea și valoarea
+# fiecărui individ; indivizii peste greutatea maximă primesc 0, ca în rucsac.py
+def evaluate(population, matrix, max_weight) -> np.ndarray:
+    fitness = np.empty(len(population))
+    for start in range(0, len(population), FITNESS_BLOCK):
+        totals = population[start:start + FITNESS_BLOCK] @ matrix
+        fitness[start:start + FITNESS_BLOCK] = np.where(totals[:, 0] <= max_weight, totals[:, 1], 0)
+    return fitness
+
+
+# Selecția prin turnee pentru toată populația deodată: fiecare părinte este câștigătorul
+# unei perechi aleatoare (la egalitate câștigă al doilea, ca în rucsac.py)
+def selection(rng, fitness, count) -> np.ndarray:
+    first, second = rng.integers(0, len(fitness), size=(2, count))
+    return np.where(fitness[first] > fitness[second], first, second)
+
+
+# Recombinarea perechilor (a[k], b[k]) pentru care `mask[k]` este adevărat: primul copil
+# ia prima jumătate de la a și restul de la b, al doilea invers
+def crossover(parents_a, parents_b, mask):
+    n_items = parents_a.shape[1]
+    from_a = (np.arange(n_items) < n_items // 2)[None, :] | ~mask[:, None]
+    child1 = np.where(from_a, parents_a, parents_b)
+    child2 = np.where(from_a, parents_b, parents_a)
+    return child1, child2
+
+
+# Mutația pe rândurile `mask` ale populației: fiecare bit este inversat cu probabilitatea `rate`.
+# Numărul de biți inversați se trage o singură dată (distribuție binomială), fără
+# să generăm câte un număr aleator pentru fiecare bit.
+def mutate(rng, population, mask, rate):
+    rows = np.flatnonzero(mask)
+    if rows.size == 0:
+        return
+    n_items = population.shape[1]
+    flips = rng.binomial(rows.size * n_items, rate)
+    positions = rng.integers(0, rows.size * n_items, size=flips)
+    population[rows[positions // n_items], positions % n_items] ^= 1
+
+
+# Generația următoare, construită pe perechi de părinți ca în rucsac.py: o pereche este
+# copiată direct cu REPRODUCTION_RATE, altfel recombinată cu CROSSOVER_RATE, altfel nu
+# dă copii. Doar copiii recombinați trec prin mutație, cu MUTATION_RATE.
+def next_generation(rng, population, fitness) -> np.ndarray:
+    pairs = (len(population) + 1) // 2
+    # Tragem deciziile pe loturi și păstrăm doar perechile care dau copii, până avem destule
+    recombine = np.zeros(0, dtype=bool)
+    while len(recombine) < pairs:
+        draws = 2 * (pairs - len(recombine))
+        reproduce = rng.random(draws) < REPRODUCTION_RATE
+        crossed = ~reproduce & (rng.random(draws) < CROSSOVER_RATE)
+        recombine = np.concatenate((recombine, crossed[reproduce | crossed]))
+    recombine = recombine[:pairs]
+
+    parents_a = population[selection(rng, fitness, pairs)]
+    parents_b = population[selection(rng, fitness, pairs)]
+    child1, child2 = crossover(parents_a, parents_b, recombine)
+
+    mutation = recombine & (rng.random(pairs) < MUTATION_RATE)
+    children = np.concatenate((child1, child2))
+    mutate(rng, children, np.concatenate((mutation, mutation)), MUTATION_RATE)
+    # Copiii fiecărei perechi stau unul lângă altul, ca în lista din rucsac.py
+    children = children.reshape(2, pairs, -1).swapaxes(0, 1).reshape(2 * pairs, population.shape[1])
+    return children[:len(population)]
+
+
+# Algoritmul genetic pe populația matriceală.
+# Returnează (biții celui mai bun individ, fitness-ul său, fitness-ul mediu pe generații).
+def solve_knapsack(weights, values, max_weight, pop_size=6, generations=500, seed=None):
+    rng = np.random.default_rng(seed)
+    matrix = item_matrix(weights, values)
+    population = generate_population(rng, pop_size, len(weights))
+
+    avg_fitnesses = []
+    for _ in range(generations):
+        fitness = evaluate(population, matrix, max_weight)
+        avg_fitnesses.append(fitness.mean())
+        population = next_generation(rng, population, fitness)
+
+    # Cel mai bun individ din ultima generație
+    fitness = evaluate(population, matrix, max_weight)
+    best = int(np.argmax(fitness))
+    return population[best], fitness[best], avg_fitnesses
+
+
+if __name__ == '__main__':
+    # Problema din rucsac.py
+    weights = [item.weight for item in items]
+    values = [item.value for item in items]
+    bits, best_fitness, _ = solve_knapsack(weights, values, MAX_KNAPSACK_WEIGHT, seed=0)
+    print(bits.tolist(), best_fitness)
+
+    # O instanță aleatoare mare: 2000 de obiecte și o populație de 10000 de indivizi
+    rng = np.random.default_rng(0)
+    weights = rng.integers(1, 100, size=2000)
+    values = rng.integers(1, 100, size=2000)
+    start_time = time.perf_counter()
+    bits, best_fitness, _ = solve_knapsack(weights, values, weights.sum() // 2, pop_size=10000,
+                                           generations=50, seed=0)
+    print(f"2000 obiecte, 10000 indivizi, 50 generații: fitness = {best_fitness}, "
+          f"timp = {time.perf_counter() - start_time:.2f}s")
@@ -1,37 +1,219 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Read the CSV file containing the results
-results_file = "results.csv"
-data = pd.read_csv(results_file)
-
-# Classify instance sizes based on the number of deposits and retailers
-def classify_instance_size(row):
-    if row["Instance Name"].startswith("small"):
-        return "Small (2x3)"
-    elif row["Instance Name"].startswith("medium"):
-        return "Medium (5x15)"
-    elif row["Instance Name"].startswith("large"):
-        return "Large (10x50)"
+import argparse
+import os
+
+import numpy as np
+
+# Rows read from a CSV file at a time
+CHUNK_ROWS = 1_000_000
+
+# Size classes of the Lab01 sets, by shape and by instance name prefix
+SIZE_CLASSES = {(2, 3): "Small (2x3)", (5, 15): "Medium (5x15)", (10, 50): "Large (10x50)"}
+NAME_CLASSES = {"small": "Small (2x3)", "medium": "Medium (5x15)", "large": "Large (10x50)"}
+
+# Columns used from a result table and how they are read. Batch rows of failed
+# instances have empty fields, hence the nullable types. Results written before the
+# Solver, d and r columns existed only have the other ones.
+RESULT_DTYPES = {
+    "Instance Name": "string",
+    "Solver": "category",
+    "d": "Int32",
+    "r": "Int32",
+    "Cost": "float64",
+    "Iterations": "Int64",
+    "Running Time": "float64",
+    "Solved": "boolean",
+}
+
+METRICS = ["Iterations", "Running Time", "Cost"]
+
+
+# Size class of every row of a chunk, with vectorized column operations.
+# The d and r columns give the class when present: a Lab01 shape gets its usual
+# label, any other shape "d x r" (generated instances). Without them the name prefix
+# decides, and names like generated_300x400_00_uniform_e0.05_c30-90_simple still give their shape.
+def classify_sizes(data):
+    import pandas as pd
+
+    if "d" in data and "r" in data:
+        d, r = data["d"], data["r"]
+    else:
+        shape = data["Instance Name"].str.extract(r"(\d+)x(\d+)")
+        d, r = pd.to_numeric(shape[0]).astype("Int32"), pd.to_numeric(shape[1]).astype("Int32")
+    labels = d.astype("string") + "x" + r.astype("string")
+    for (rows, cols), label in SIZE_CLASSES.items():
+        labels = labels.mask(((d == rows) & (r == cols)).fillna(False), label)
+    if "d" not in data:
+        prefix = data["Instance Name"].str.extract(r"^([a-z]+)_", expand=False).map(NAME_CLASSES)
+        labels = prefix.fillna(labels)
+    return labels.fillna("Unknown").astype("category")
+
+
+# Compact frames of a result table, one per chunk: Solver, Instance Size and the
+# metrics. CSV files are read CHUNK_ROWS rows at a time with fixed dtypes, Parquet
+# files (needs pyarrow) one row group batch at a time.
+def read_results(results_file, chunksize=CHUNK_ROWS):
+    import pandas as pd
+
+    if results_file.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(results_file)
+        columns = [name for name in RESULT_DTYPES if name in parquet.schema_arrow.names]
+        chunks = (batch.to_pandas() for batch in parquet.iter_batches(batch_size=chunksize, columns=columns))
     else:
-        return "Unknown"
-
-# Add a new column for instance size
-data["Instance Size"] = data.apply(classify_instance_size, axis=1)
-
-# Visualize the number of iterations based on instance size
-plt.figure(figsize=(10, 6))
-sns.boxplot(x="Instance Size", y="Iterations", data=data)
-plt.title("Number of Iterations by Instance Size")
-plt.xlabel("Instance Size")
-plt.ylabel("Number of Iterations")
-plt.show()
-
-# Visualize the running time based on instance size
-plt.figure(figsize=(10, 6))
-sns.boxplot(x="Instance Size", y="Running Time", data=data)
-plt.title("Running Time by Instance Size")
-plt.xlabel("Instance Size")
-plt.ylabel("Running Time (seconds)")
-plt.show()
+        header = pd.read_csv(results_file, nrows=0).columns
+        columns = [name for name in RESULT_DTYPES if name in header]
+        chunks = pd.read_csv(results_file, usecols=columns, dtype={name: RESULT_DTYPES[name] for name in columns},
+                             chunksize=chunksize)
+
+    for chunk in chunks:
+        compact = pd.DataFrame({
+            "Solver": chunk["Solver"] if "Solver" in chunk else "-",
+            "Instance Size": classify_sizes(chunk),
+        })
+        compact["Solver"] = compact["Solver"].astype("category")
+        for name in METRICS + ["Solved"]:
+            if name in chunk:
+                compact[name] = chunk[name]
+        yield compact
+
+
+# Solver and size class columns the statistics are grouped by
+GROUP_KEYS = ["Solver", "Instance Size"]
+
+# Rows kept per group for the medians and box plots. Larger groups are represented by a
+# uniform random sample of this size, so memory stays bounded however long the table.
+SAMPLE_ROWS = 100_000
+
+
+# Partial statistics of one chunk per group: count, mean, sum of squared deviations
+# from the mean (m2), min and max of every metric, plus the solved and answered rows
+def chunk_statistics(chunk):
+    metrics = [name for name in METRICS if name in chunk]
+    keys = [chunk[key].astype("string") for key in GROUP_KEYS]
+    groups = chunk[metrics].astype("float64").groupby(keys)
+    count = groups.count()
+    stats = {"count": count, "mean": groups.mean(), "m2": groups.var(ddof=0) * count,
+             "min": groups.min(), "max": groups.max()}
+    if "Solved" in chunk:
+        solved = chunk["Solved"].astype("float64").groupby(keys)
+        stats["solved"], stats["answered"] = solved.sum(), solved.count()
+    return stats
+
+
+# Running statistics of two sets of rows combined (Chan et al. parallel update of the
+# mean and m2); groups missing from one side count as empty there
+def merge_statistics(a, b):
+    if a is None:
+        return b
+    index = a["count"].index.union(b["count"].index)
+    a = {name: value.reindex(index) for name, value in a.items()}
+    b = {name: value.reindex(index) for name, value in b.items()}
+    n_a, n_b = a["count"].fillna(0), b["count"].fillna(0)
+    n = n_a + n_b
+    share = (n_b / n).fillna(0)
+    delta = b["mean"].fillna(0) - a["mean"].fillna(0)
+    merged = {
+        "count": n,
+        "mean": a["mean"].fillna(0) + delta * share,
+        "m2": a["m2"].fillna(0) + b["m2"].fillna(0) + delta ** 2 * n_a * share,
+        "min": np.fmin(a["min"], b["min"]),
+        "max": np.fmax(a["max"], b["max"]),
+    }
+    for name in ("solved", "answered"):
+        if name in a or name in b:
+            merged[name] = a.get(name, 0).fillna(0) + b.get(name, 0).fillna(0)
+    return merged
+
+
+# Bounded uniform sample of the rows seen so far: every row gets a random key and each
+# group keeps the SAMPLE_ROWS rows with the smallest keys (bottom-k sampling)
+def update_sample(sample, chunk, rng, size=SAMPLE_ROWS):
+    import pandas as pd
+
+    metrics = [name for name in METRICS if name in chunk]
+    part = pd.DataFrame({key: chunk[key].astype("string") for key in GROUP_KEYS})
+    for name in metrics:
+        part[name] = chunk[name].astype("float64")
+    part["_key"] = rng.random(len(part))
+    combined = part if sample is None else pd.concat([sample, part], ignore_index=True)
+    if combined.groupby(GROUP_KEYS, observed=True).size().max() <= size:
+        return combined
+    return combined.sort_values("_key").groupby(GROUP_KEYS, observed=True, sort=False).head(size)
+
+
+# Count, mean, median, spread and range of every metric per solver and size class, plus
+# the share of solved instances. Everything but the median comes from the running
+# statistics; the median is that of the sample, exact for groups of up to SAMPLE_ROWS rows.
+def summarize(stats, sample):
+    import pandas as pd
+
+    columns = {}
+    medians = sample.groupby(GROUP_KEYS)[list(stats["count"].columns)].median()
+    for metric in stats["count"].columns:
+        n = stats["count"][metric]
+        columns[f"{metric} count"] = n.astype("int64")
+        columns[f"{metric} mean"] = stats["mean"][metric].where(n > 0)
+        columns[f"{metric} median"] = medians[metric].reindex(n.index)
+        columns[f"{metric} std"] = np.sqrt(stats["m2"][metric] / (n - 1)).where(n > 1)
+        columns[f"{metric} min"] = stats["min"][metric]
+        columns[f"{metric} max"] = stats["max"][metric]
+    if "solved" in stats:
+        columns["Solved share"] = stats["solved"] / stats["answered"]
+    return pd.DataFrame(columns)
+
+
+# Running statistics and the plot sample of a whole result table, read chunk by chunk
+def summarize_results(results_file, chunksize=CHUNK_ROWS, seed=0):
+    rng = np.random.default_rng(seed)
+    stats = sample = None
+    for chunk in read_results(results_file, chunksize):
+        stats = merge_statistics(stats, chunk_statistics(chunk))
+        sample = update_sample(sample, chunk, rng)
+    if stats is None:
+        raise ValueError(f"No results in {results_file}.")
+    return summarize(stats, sample), sample
+
+
+# Read, classify and summarize a result table, then write the summary and one box
+# plot per metric into `output_dir`. The summary is computed while the chunks stream
+# in and the plots are drawn from the bounded sample, so memory does not grow with the
+# number of rows. Plots are rendered with the Agg backend, so no display is needed.
+def plot_statistics(results_file="results.csv", output_dir="plots", chunksize=CHUNK_ROWS):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    summary, sample = summarize_results(results_file, chunksize)
+    os.makedirs(output_dir, exist_ok=True)
+    summary.to_csv(os.path.join(output_dir, "summary.csv"))
+    print(summary.to_string())
+
+    hue = "Solver" if sample["Solver"].nunique() > 1 else None
+    sizes = set(sample["Instance Size"])
+    known = [label for label in SIZE_CLASSES.values() if label in sizes]
+    order = known + sorted(sizes - set(known))
+    labels = {"Iterations": "Number of Iterations", "Running Time": "Running Time (seconds)", "Cost": "Cost"}
+    for metric in METRICS:
+        if metric not in sample:
+            continue
+        fig, ax = plt.subplots(figsize=(10, 6))
+        sns.boxplot(x="Instance Size", y=metric, hue=hue, data=sample, order=order, ax=ax)
+        ax.set_title(f"{labels[metric]} by Instance Size")
+        ax.set_xlabel("Instance Size")
+        ax.set_ylabel(labels[metric])
+        fig.savefig(os.path.join(output_dir, metric.lower().replace(" ", "_") + ".png"), dpi=120,
+                    bbox_inches="tight")
+        plt.close(fig)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Statistics and box plots of a result table.")
+    parser.add_argument("results_file", nargs="?", default="results.csv", help=".csv or .parquet result table")
+    parser.add_argument("-o", "--output-dir", default="plots", help="directory for summary.csv and the plots")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="CSV rows read at a time")
+    args = parser.parse_args()
+    plot_statistics(args.results_file, args.output_dir, args.chunksize)
@@ -0,0 +1,3 @@
+from transport.cli import main
+
+main()
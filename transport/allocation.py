@@ -0,0 +1,73 @@
+import numpy as np
+
+
+# Sparse allocation: the basic cells of a solution as parallel arrays.
+# Solvers return this instead of a dense d x r matrix, which for large instances
+# would be mostly zeros.
+# A solution of an unbalanced instance closed by a virtual dummy line (see
+# transport.balance) also reports what went to it: `unshipped` per depot (the dummy
+# column) and `unmet` per retailer (the dummy row). Both are None otherwise.
+class Allocation:
+    def __init__(self, rows, cols, amounts, shape, unshipped=None, unmet=None):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=np.int64)
+        self.shape = shape
+        self.unshipped = None if unshipped is None else np.asarray(unshipped, dtype=np.int64)
+        self.unmet = None if unmet is None else np.asarray(unmet, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"Allocation({len(self)} cells, shape={self.shape})"
+
+    # Transportation cost: a single gather over Cjk
+    def cost(self, Cjk):
+        return np.dot(self.amounts, Cjk[self.rows, self.cols]).item()
+
+    # Fixed charge of every route that carries a positive amount
+    def fixed_cost(self, Fjk):
+        used = self.amounts > 0
+        return Fjk[self.rows[used], self.cols[used]].sum().item()
+
+    def to_dense(self):
+        matrix = np.zeros(self.shape, dtype=np.int64)
+        np.add.at(matrix, (self.rows, self.cols), self.amounts)
+        return matrix
+
+    @classmethod
+    def from_dense(cls, matrix):
+        rows, cols = np.nonzero(matrix)
+        return cls(rows, cols, matrix[rows, cols], matrix.shape)
+
+
+# Allocations of N same-shape instances solved together, padded to a common width.
+# Row n holds counts[n] cells; the padding has zero amounts.
+class StackedAllocation:
+    def __init__(self, rows, cols, amounts, counts, shape):
+        self.rows = rows
+        self.cols = cols
+        self.amounts = amounts
+        self.counts = counts
+        self.shape = shape
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __repr__(self):
+        return f"StackedAllocation({len(self)} instances, shape={self.shape})"
+
+    def __getitem__(self, n):
+        k = self.counts[n]
+        return Allocation(self.rows[n, :k], self.cols[n, :k], self.amounts[n, :k], self.shape)
+
+    # Transportation cost of every instance, Cjk of shape (N, d, r)
+    def cost(self, Cjk):
+        picked = Cjk[np.arange(len(self))[:, None], self.rows, self.cols]
+        return np.einsum('nk,nk->n', self.amounts, picked)
+
+    # Fixed charge of every route carrying a positive amount, Fjk of shape (N, d, r)
+    def fixed_cost(self, Fjk):
+        picked = Fjk[np.arange(len(self))[:, None], self.rows, self.cols]
+        return np.where(self.amounts > 0, picked, 0).sum(axis=1)
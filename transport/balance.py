@@ -0,0 +1,34 @@
+import numpy as np
+
+from transport.allocation import Allocation
+
+
+# Supply and demand of an instance closed by a virtual dummy line: a column (index r)
+# taking the spare supply, or a row (index d) supplying the missing demand. Only the
+# two vectors grow by one entry; Cjk is never padded, the engines treat every cell
+# outside it as a zero-cost route. A balanced instance gets no dummy line.
+# Returns new (supply, demand) int64 arrays.
+def balance(SCj, Dk):
+    supply = np.array(SCj, dtype=np.int64)
+    demand = np.array(Dk, dtype=np.int64)
+    excess = int(supply.sum() - demand.sum())
+    if excess > 0:
+        demand = np.append(demand, excess)
+    elif excess < 0:
+        supply = np.append(supply, -excess)
+    return supply, demand
+
+
+# Allocation over the real (d, r) cells of a solution of the balanced vectors; the
+# amounts on the dummy column and row become `unshipped` and `unmet`
+def split_dummy(rows, cols, amounts, shape):
+    d, r = shape
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    to_column = cols >= r
+    to_row = rows >= d
+    real = ~(to_column | to_row)
+    unshipped = np.bincount(rows[to_column], amounts[to_column], minlength=d).astype(np.int64)
+    unmet = np.bincount(cols[to_row], amounts[to_row], minlength=r).astype(np.int64)
+    return Allocation(rows[real], cols[real], amounts[real], shape, unshipped, unmet)
@@ -0,0 +1,141 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from transport.cache import load_instance
+from transport.instances import read_instance_name
+from transport.registry import is_solved, parse_pipeline, solve
+from transport.results import FLUSH_EVERY, ResultWriter, completed_instances
+from transport.stacked import STACKED_SOLVERS, solve_stacked
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Instance sets shipped with the repository
+INSTANCE_DIRS = {
+    'simple': os.path.join(ROOT, 'Lab_simple_instances'),
+    'FCD': os.path.join(ROOT, 'Vogel Method', 'Lab_FCD_instances'),
+    'FCR': os.path.join(ROOT, 'Minimu Matrix Method', 'Lab_FCR_instances'),
+}
+
+# Instances of one shape solved together by the stacked engines, which bounds how many
+# are held in memory at once
+STACKED_GROUP_SIZE = 256
+
+RESULT_HEADER = ["Instance Name", "Solver", "d", "r", "Cost", "Iterations", "Running Time", "Solved"]
+
+
+# Sorted .dat paths of a directory, so every run sees the same order
+def list_instances(input_directory):
+    return [
+        os.path.join(input_directory, file_name)
+        for file_name in sorted(os.listdir(input_directory))
+        if file_name.endswith(".dat")
+    ]
+
+
+# Load and solve a single file with a registry pipeline ("vogel", "vogel+modi", ...);
+# runs inside the worker processes
+def solve_file(solver_name, file_path):
+    try:
+        instance = load_instance(file_path)
+        start_time = time.perf_counter()
+        cost, allocation, iterations = solve(instance, solver_name)
+        running_time = time.perf_counter() - start_time
+        solved = is_solved(instance, allocation)
+    except Exception as e:
+        return _error_row(solver_name, file_path, e)
+    return [instance.name, solver_name, instance.d, instance.r, int(cost), int(iterations), running_time, solved]
+
+
+# Solve every instance of a directory on a process pool.
+# Rows are yielded in file order regardless of which worker finishes first.
+# Instances whose name is in `exclude` are skipped; `workers=1` runs in-process,
+# which is handy for debugging.
+def iter_batch(solver_name, input_directory, workers=None, chunksize=1, exclude=()):
+    parse_pipeline(solver_name)
+    files = list_instances(INSTANCE_DIRS.get(input_directory, input_directory))
+    if exclude:
+        files = [file_path for file_path in files if read_instance_name(file_path) not in exclude]
+    task = partial(solve_file, solver_name)
+
+    if workers == 1:
+        yield from map(task, files)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(task, files, chunksize=chunksize)
+
+
+# Result row of an instance that could not be loaded or solved
+def _error_row(solver_name, file_path, error):
+    print(f"Error processing {file_path}: {error}")
+    return [os.path.basename(file_path), solver_name, '', '', '', '', '', False]
+
+
+# Solve every instance of a directory in-process with the stacked engines, one
+# vectorized solve per group of up to `group_size` same-shape instances. Instances are
+# loaded as the files are read and held only until their group is full (or the files
+# run out), so rows come out group by group rather than in file order. The running
+# time of each row is its share of its group's solve. If a group fails, its instances
+# are solved one by one, and those that still fail get the same error row as in
+# solve_file.
+def iter_stacked(solver_name, input_directory, exclude=(), group_size=STACKED_GROUP_SIZE):
+    if solver_name not in STACKED_SOLVERS:
+        raise ValueError(f"No stacked engine for '{solver_name}'. Choose one of {sorted(STACKED_SOLVERS)}.")
+    groups = {}
+    for file_path in list_instances(INSTANCE_DIRS.get(input_directory, input_directory)):
+        try:
+            if exclude and read_instance_name(file_path) in exclude:
+                continue
+            instance = load_instance(file_path)
+        except Exception as e:
+            yield _error_row(solver_name, file_path, e)
+            continue
+        group = groups.setdefault((instance.d, instance.r), [])
+        group.append((file_path, instance))
+        if len(group) == group_size:
+            yield from _solve_group(solver_name, group)
+            group.clear()
+    for group in groups.values():
+        if group:
+            yield from _solve_group(solver_name, group)
+
+
+# Rows of one shape group; if the stacked solve fails, its instances are retried one by
+# one so that only the failing ones get an error row
+def _solve_group(solver_name, group):
+    instances = [instance for _, instance in group]
+    start_time = time.perf_counter()
+    try:
+        results = solve_stacked(solver_name, instances)
+    except Exception as e:
+        if len(group) == 1:
+            yield _error_row(solver_name, group[0][0], e)
+        else:
+            for member in group:
+                yield from _solve_group(solver_name, [member])
+        return
+    running_time = (time.perf_counter() - start_time) / len(instances)
+    for instance, (cost, allocation, iterations) in zip(instances, results):
+        yield [instance.name, solver_name, instance.d, instance.r, int(cost), int(iterations), running_time,
+               is_solved(instance, allocation)]
+
+
+def run_batch(solver_name, input_directory, workers=None, chunksize=1, exclude=()):
+    return list(iter_batch(solver_name, input_directory, workers, chunksize, exclude))
+
+
+# Stream the rows of a batch into a CSV file as they come in.
+# With `resume=True` the instances already present in the file are not solved again.
+# With `stacked=True` the stacked engines are used instead of the process pool.
+def write_batch(solver_name, input_directory, output_file, workers=None, chunksize=1,
+                resume=False, flush_every=FLUSH_EVERY, stacked=False):
+    exclude = completed_instances(output_file, solver_name) if resume else ()
+    if stacked:
+        rows = iter_stacked(solver_name, input_directory, exclude)
+    else:
+        rows = iter_batch(solver_name, input_directory, workers, chunksize, exclude)
+    with ResultWriter(output_file, RESULT_HEADER, flush_every, resume) as writer:
+        for row in rows:
+            writer.write(row)
+
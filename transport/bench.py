@@ -0,0 +1,301 @@
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from transport.generate import InstanceSpec, write_dat
+from transport.instances import read_instance
+from transport.modi import modi
+from transport.registry import solve
+from transport.vogel import vogel_incremental
+from transport.warm import apply_delta, resolve
+
+# Size grid, from the Lab01 "small" shape up to 5000 x 5000
+SIZES = ((2, 3), (5, 15), (10, 50), (100, 100), (200, 200), (500, 500), (1000, 1000), (2000, 2000), (5000, 5000))
+
+SOLVERS = ('nwc', 'vogel', 'min-matrix', 'min-matrix-fc', 'vogel+modi')
+
+# Largest d * r each solver is run on; beyond it a single run takes minutes
+MAX_CELLS = {
+    'vogel': 1000 * 1000,
+    'min-matrix-fc': 2000 * 2000,
+    'vogel+modi': 500 * 500,
+}
+
+WARMUP = 1
+REPEATS = 5
+# Once a phase has run this long (seconds) no more repeats are started
+TIME_BUDGET = 10.0
+
+# Median slowdown against a baseline report that is flagged as a regression
+REGRESSION_RATIO = 1.25
+
+# Warm against cold re-solves: sizes and the fraction of SCj, Dk and Cjk entries changed
+WARM_SIZES = ((100, 100), (200, 200), (500, 500))
+PERTURBATIONS = (0.01, 0.1)
+# Changed entries are scaled by a factor drawn from this range
+PERTURBATION_SCALE = (0.9, 1.1)
+
+
+# Time `run()` with perf_counter_ns: `warmup` untimed calls, then up to `repeats`
+# timed ones, stopping early once `budget` seconds have been spent.
+# Returns (timings in ns, last result).
+def time_ns(run, warmup=WARMUP, repeats=REPEATS, budget=TIME_BUDGET):
+    result = None
+    for _ in range(warmup):
+        result = run()
+    timings = []
+    deadline = time.perf_counter_ns() + int(budget * 1e9)
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter_ns()
+        result = run()
+        timings.append(time.perf_counter_ns() - start)
+        if time.perf_counter_ns() > deadline:
+            break
+    return timings, result
+
+
+# Peak traced memory (bytes) of one call to `run()`
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(timings):
+    return {
+        'runs': len(timings),
+        'min_ns': min(timings),
+        'median_ns': int(statistics.median(timings)),
+        'mean_ns': int(statistics.fmean(timings)),
+        'max_ns': max(timings),
+    }
+
+
+# Write the result row and the allocated cells, like a batch run would
+def write_solution(output_file, instance, solver_name, cost, allocation, iterations):
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([instance.name, solver_name, instance.d, instance.r, cost, iterations])
+        writer.writerows(zip(allocation.rows.tolist(), allocation.cols.tolist(), allocation.amounts.tolist()))
+
+
+# Benchmark every solver on one seeded instance per size.
+# Each record holds the parse (the .dat file, no cache), solve and write phase
+# timings and the peak traced memory of one parse and one solve.
+def run_benchmark(sizes=SIZES, solvers=SOLVERS, seed=0, variant='simple', warmup=WARMUP,
+                  repeats=REPEATS, budget=TIME_BUDGET, work_dir=None, log=None):
+    records = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        for d, r in sizes:
+            runnable = [name for name in solvers if d * r <= MAX_CELLS.get(name, math.inf)]
+            if not runnable:
+                continue
+            file_path = os.path.join(tmp_dir, f"bench_{d}x{r}.dat")
+            write_dat(InstanceSpec(d, r, seed, variant), file_path)
+
+            parse_timings, instance = time_ns(lambda: read_instance(file_path), warmup, repeats, budget)
+            parse_peak = peak_memory(lambda: read_instance(file_path))
+
+            for solver_name in runnable:
+                solve_timings, (cost, allocation, iterations) = time_ns(
+                    lambda: solve(instance, solver_name), warmup, repeats, budget)
+                solve_peak = peak_memory(lambda: solve(instance, solver_name))
+                output_file = os.path.join(tmp_dir, 'solution.csv')
+                write_timings, _ = time_ns(
+                    lambda: write_solution(output_file, instance, solver_name, cost, allocation, iterations),
+                    warmup, repeats, budget)
+
+                record = {
+                    'solver': solver_name,
+                    'd': d,
+                    'r': r,
+                    'cells': d * r,
+                    'seed': seed,
+                    'variant': variant,
+                    'cost': int(cost),
+                    'iterations': int(iterations),
+                    'parse': summarize(parse_timings),
+                    'solve': summarize(solve_timings),
+                    'write': summarize(write_timings),
+                    'parse_peak_bytes': parse_peak,
+                    'solve_peak_bytes': solve_peak,
+                }
+                records.append(record)
+                if log is not None:
+                    print(format_record(record), file=log, flush=True)
+    return {'environment': environment(), 'records': records}
+
+
+# Change a `fraction` of the supply, demand and cost entries of an instance by up to
+# +-10% each (seeded). Returns the changed copy.
+def perturb(instance, fraction, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def changed(values, count):
+        positions = rng.choice(values.size, count, replace=False)
+        scaled = np.rint(values.flat[positions] * rng.uniform(*PERTURBATION_SCALE, size=count)).astype(np.int64)
+        return positions, scaled
+
+    d, r = instance.d, instance.r
+    rows, supply = changed(np.asarray(instance.SCj), math.ceil(fraction * d))
+    cols, demand = changed(np.asarray(instance.Dk), math.ceil(fraction * r))
+    cells, costs = changed(np.asarray(instance.Cjk), math.ceil(fraction * d * r))
+    cell_rows, cell_cols = np.divmod(cells, r)
+    return apply_delta(instance, dict(zip(rows.tolist(), supply.tolist())), dict(zip(cols.tolist(), demand.tolist())),
+                       zip(cell_rows.tolist(), cell_cols.tolist(), costs.tolist()))
+
+
+# Re-solve perturbed copies of a seeded instance per size both ways: cold (Vogel start,
+# then MODI) and warm (transport.warm.resolve from the optimum of the original).
+# Both must reach the same optimal cost.
+def run_warm_benchmark(sizes=WARM_SIZES, fractions=PERTURBATIONS, seed=0, warmup=WARMUP, repeats=REPEATS,
+                       budget=TIME_BUDGET, log=None):
+    records = []
+    for d, r in sizes:
+        instance = InstanceSpec(d, r, seed).build()
+        _, previous, _ = solve(instance, 'vogel+modi', dummy=True)
+        for fraction in fractions:
+            changed = perturb(instance, fraction, seed)
+
+            def cold():
+                _, start, _ = vogel_incremental(changed.SCj, changed.Dk, changed.Cjk, dummy=True)
+                return modi(changed.SCj, changed.Dk, changed.Cjk, start)
+
+            def warm():
+                return resolve(changed.SCj, changed.Dk, changed.Cjk, previous)
+
+            cold_timings, (cold_cost, _, cold_pivots) = time_ns(cold, warmup, repeats, budget)
+            warm_timings, (warm_cost, _, warm_pivots) = time_ns(warm, warmup, repeats, budget)
+            if cold_cost != warm_cost:
+                raise AssertionError(f"Warm re-solve of {d}x{r} reached {warm_cost}, the cold solve {cold_cost}.")
+            record = {
+                'd': d,
+                'r': r,
+                'fraction': fraction,
+                'cost': int(cold_cost),
+                'cold': summarize(cold_timings),
+                'warm': summarize(warm_timings),
+                'cold_pivots': int(cold_pivots),
+                'warm_pivots': int(warm_pivots),
+            }
+            records.append(record)
+            if log is not None:
+                print(f"{d:>5}x{r:<5} {fraction:>5.0%} changed  "
+                      f"cold {record['cold']['median_ns'] / 1e6:>10.3f} ms ({cold_pivots} pivots)  "
+                      f"warm {record['warm']['median_ns'] / 1e6:>10.3f} ms ({warm_pivots} pivots)",
+                      file=log, flush=True)
+    return {'environment': environment(), 'warm_records': records}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def format_record(record):
+    return (f"{record['solver']:>14} {record['d']:>5}x{record['r']:<5} "
+            f"parse {record['parse']['median_ns'] / 1e6:>10.3f} ms  "
+            f"solve {record['solve']['median_ns'] / 1e6:>10.3f} ms  "
+            f"write {record['write']['median_ns'] / 1e6:>8.3f} ms  "
+            f"peak {record['solve_peak_bytes'] / 2 ** 20:>9.1f} MiB")
+
+
+# Empirical scaling exponent of the median solve time between consecutive sizes:
+# time ~ cells ** exponent, so 1.0 is linear in d * r
+def scaling(records):
+    by_solver = {}
+    for record in records:
+        by_solver.setdefault(record['solver'], []).append(record)
+    curves = {}
+    for solver_name, points in by_solver.items():
+        points.sort(key=lambda record: record['cells'])
+        curve = []
+        for previous, current in zip(points, points[1:]):
+            ratio = current['solve']['median_ns'] / max(previous['solve']['median_ns'], 1)
+            exponent = math.log(ratio) / math.log(current['cells'] / previous['cells'])
+            curve.append({'d': current['d'], 'r': current['r'], 'exponent': round(exponent, 3)})
+        curves[solver_name] = curve
+    return curves
+
+
+# Median solve time of every record against the same solver and size in a baseline
+# report; a ratio above `threshold` is a regression
+def compare(report, baseline, threshold=REGRESSION_RATIO):
+    reference = {(record['solver'], record['d'], record['r']): record for record in baseline['records']}
+    rows = []
+    for record in report['records']:
+        old = reference.get((record['solver'], record['d'], record['r']))
+        if old is None:
+            continue
+        ratio = record['solve']['median_ns'] / max(old['solve']['median_ns'], 1)
+        rows.append({
+            'solver': record['solver'], 'd': record['d'], 'r': record['r'],
+            'ratio': round(ratio, 3), 'regression': ratio > threshold,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m transport bench",
+                                     description="Benchmark the transportation solvers across a size grid.")
+    parser.add_argument("-o", "--output", default="bench.json", help="JSON report file")
+    parser.add_argument("-s", "--solvers", nargs="+", default=list(SOLVERS))
+    parser.add_argument("--max-cells", type=int, default=None, help="skip sizes with more than d * r cells")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variant", default="simple", choices=("simple", "FCD", "FCR"))
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET, help="seconds per phase before repeats stop")
+    parser.add_argument("--baseline", default=None, help="earlier JSON report to compare against")
+    parser.add_argument("--warm", action="store_true",
+                        help="compare warm re-solves of perturbed instances with cold solves instead")
+    parser.add_argument("--fractions", type=float, nargs="+", default=list(PERTURBATIONS),
+                        help="fractions of the entries changed for --warm")
+    args = parser.parse_args(argv)
+
+    if args.warm:
+        sizes = [size for size in WARM_SIZES if args.max_cells is None or size[0] * size[1] <= args.max_cells]
+        report = run_warm_benchmark(sizes, args.fractions, args.seed, args.warmup, args.repeats, args.budget,
+                                    log=sys.stdout)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        return
+
+    sizes = [size for size in SIZES if args.max_cells is None or size[0] * size[1] <= args.max_cells]
+    report = run_benchmark(sizes, args.solvers, args.seed, args.variant, args.warmup, args.repeats,
+                           args.budget, log=sys.stdout)
+    report['scaling'] = scaling(report['records'])
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(report, json.load(f))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for solver_name, curve in report['scaling'].items():
+        exponents = ' '.join(f"{point['d']}x{point['r']}:{point['exponent']:.2f}" for point in curve)
+        print(f"scaling {solver_name:>14} {exponents}")
+    for row in report.get('comparison', ()):
+        if row['regression']:
+            print(f"REGRESSION {row['solver']} {row['d']}x{row['r']}: {row['ratio']:.2f}x the baseline")
+
+
+if __name__ == '__main__':
+    main()
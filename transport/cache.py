@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from transport.costs import SparseCosts
+from transport.instances import CHUNK_SIZE, Instance, read_instance
+
+# Bump when the on-disk layout changes so old entries are rebuilt
+CACHE_VERSION = 1
+CACHE_DIR_NAME = '.instance_cache'
+
+ARRAY_KEYS = ('SCj', 'Dk', 'Fj', 'Cjk', 'Fjk')
+
+
+# Load an instance through the binary cache, parsing the .dat file only on a miss.
+# Entries are keyed by a content hash; a per-file stamp (mtime + size) lets unchanged
+# files skip hashing as well. Arrays come back memory-mapped and read-only, so large
+# cost matrices are paged in lazily. When the cache cannot be written (read-only
+# instance directory, full disk) the parsed instance is returned uncached.
+def load_instance(file_path, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return read_instance(file_path)
+
+    stat = os.stat(file_path)
+    stamp_path = os.path.join(cache_dir, os.path.basename(file_path) + '.stamp')
+    stamp = _read_json(stamp_path)
+    if (stamp is not None and stamp.get('version') == CACHE_VERSION
+            and stamp['mtime_ns'] == stat.st_mtime_ns and stamp['size'] == stat.st_size):
+        entry_dir = os.path.join(cache_dir, stamp['digest'])
+        if os.path.isdir(entry_dir):
+            return load_entry(entry_dir)
+
+    digest = file_digest(file_path)
+    entry_dir = os.path.join(cache_dir, digest)
+    if not os.path.isdir(entry_dir):
+        instance = read_instance(file_path)
+        try:
+            save_entry(instance, entry_dir)
+        except OSError:
+            return instance
+    try:
+        _write_json(stamp_path, {
+            'version': CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'digest': digest,
+        })
+    except OSError:
+        pass  # The entry is complete; without a stamp the next load only hashes the file again
+    return load_entry(entry_dir)
+
+
+# Hash of the file contents, read in blocks
+def file_digest(file_path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# Write an instance as one .npy file per array plus meta.json. A SparseCosts matrix is
+# stored as its three CSR arrays ({key}.indptr.npy, ...) and listed under 'sparse'.
+# The entry is built in a temporary directory and renamed into place, so concurrent
+# writers never expose a half-written entry.
+def save_entry(instance, entry_dir):
+    parent = os.path.dirname(os.path.abspath(entry_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        arrays, sparse = [], []
+        for key in ARRAY_KEYS:
+            value = getattr(instance, key)
+            if isinstance(value, SparseCosts):
+                value.save(tmp_dir, key)
+                sparse.append(key)
+            elif value is not None:
+                np.save(os.path.join(tmp_dir, key + '.npy'), np.asarray(value, dtype=np.int64))
+                arrays.append(key)
+        write_meta(tmp_dir, instance.name, instance.d, instance.r, arrays, sparse)
+        publish_entry(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+# meta.json of an entry: the instance header and the arrays stored next to it
+def write_meta(entry_dir, name, d, r, arrays, sparse=()):
+    _write_json(os.path.join(entry_dir, 'meta.json'), {
+        'version': CACHE_VERSION,
+        'name': name,
+        'd': d,
+        'r': r,
+        'arrays': list(arrays),
+        'sparse': list(sparse),
+    })
+
+
+# Rename a fully written temporary entry into place
+def publish_entry(tmp_dir, entry_dir):
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process stored the same entry first
+        if not os.path.isdir(entry_dir):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# Open a cache entry with every array memory-mapped
+def load_entry(entry_dir):
+    meta = _read_json(os.path.join(entry_dir, 'meta.json'))
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        raise ValueError(f"Invalid cache entry {entry_dir}.")
+    arrays = {
+        key: np.load(os.path.join(entry_dir, key + '.npy'), mmap_mode='r')
+        for key in meta['arrays']
+    }
+    for key in meta.get('sparse', ()):
+        arrays[key] = SparseCosts.load(entry_dir, key, (meta['d'], meta['r']))
+    return Instance(
+        meta['name'], meta['d'], meta['r'],
+        arrays['SCj'], arrays['Dk'], arrays['Cjk'],
+        Fj=arrays.get('Fj'), Fjk=arrays.get('Fjk'),
+    )
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
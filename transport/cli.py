@@ -0,0 +1,199 @@
+import argparse
+import os
+import time
+
+# Every command imports what it needs when it runs, so `solve` on one instance does
+# not pay for the process pool, the CSV writer or any plotting library.
+
+
+def _solve(args):
+    from transport.cache import load_instance
+    from transport.registry import is_solved, solve
+
+    probe = None
+    if args.profile or args.trace:
+        from transport.instrument import Probe
+
+        probe = Probe(args.trace)
+    instance = load_instance(args.file)
+    start_time = time.perf_counter()
+    cost, allocation, iterations = solve(instance, args.solver, probe, args.dummy)
+    running_time = time.perf_counter() - start_time
+    print(f"{instance.name} {args.solver}: cost = {cost}, iterations = {iterations}, "
+          f"time = {running_time:.4f}s, solved = {is_solved(instance, allocation)}")
+    if allocation.unshipped is not None and allocation.unshipped.any():
+        print(f"unshipped supply = {int(allocation.unshipped.sum())}")
+    if allocation.unmet is not None and allocation.unmet.any():
+        print(f"unmet demand = {int(allocation.unmet.sum())}")
+    if args.allocation:
+        for i, j, amount in zip(allocation.rows.tolist(), allocation.cols.tolist(), allocation.amounts.tolist()):
+            print(f"{i} {j} {amount}")
+    if probe is not None:
+        print(probe)
+        for step in probe.trace or ():
+            print(f"step {step.iteration}: ({step.row}, {step.col}) amount = {step.amount}, key = {step.key}")
+
+
+def _batch(args):
+    from transport.batch import write_batch
+
+    write_batch(args.solver, args.instances, args.output, args.workers, args.chunksize,
+                args.resume, args.flush_every, args.stacked)
+
+
+# MODI pivots from the NWC, Vogel and minimum-matrix starts
+def _compare(args):
+    from transport.batch import INSTANCE_DIRS, list_instances
+    from transport.cache import load_instance
+    from transport.modi import compare_starts
+
+    totals = {}
+    for file_path in list_instances(INSTANCE_DIRS.get(args.instances, args.instances)):
+        instance = load_instance(file_path)
+        for name, (initial_cost, cost, pivots) in compare_starts(instance).items():
+            print(f"{instance.name} {name}: initial = {initial_cost}, optimum = {cost}, pivots = {pivots}")
+            totals[name] = totals.get(name, 0) + pivots
+    for name, pivots in totals.items():
+        print(f"Total pivots from {name}: {pivots}")
+
+
+def _serve(args):
+    import asyncio
+
+    from transport.service import serve, serve_stdio
+
+    options = {key: value for key, value in (('max_batch', args.max_batch), ('batch_window', args.batch_window),
+                                             ('limit', args.stream_limit))
+               if value is not None}
+    if args.stdio:
+        asyncio.run(serve_stdio(args.workers, **options))
+    else:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, **options))
+
+
+# Replay the instances of a directory against a running service
+def _load(args):
+    import asyncio
+
+    import numpy as np
+
+    from transport.batch import INSTANCE_DIRS, list_instances
+    from transport.cache import load_instance
+    from transport.service import latency_report, load_test
+
+    requests = []
+    for file_path in list_instances(INSTANCE_DIRS.get(args.instances, args.instances)):
+        if args.inline:
+            instance = load_instance(file_path)
+            request = {'instance': {key: np.asarray(getattr(instance, key)).tolist()
+                                    for key in ('SCj', 'Dk', 'Cjk', 'Fj', 'Fjk') if getattr(instance, key) is not None}}
+        else:
+            request = {'path': os.path.abspath(file_path)}
+        request.update({'solver': args.solver, 'allocation': not args.no_allocation})
+        requests.append(request)
+    requests = [dict(request, id=k) for k, request in enumerate(requests * args.repeat)]
+
+    start_time = time.perf_counter()
+    options = {'limit': args.stream_limit} if args.stream_limit is not None else {}
+    latencies = asyncio.run(load_test(requests, args.clients, args.host, args.port, args.unix, **options))
+    report = latency_report(latencies, time.perf_counter() - start_time)
+    if not report['requests']:
+        print("0 requests")
+        return
+    print(f"{report['requests']} requests: p50 = {report['p50_ms']:.2f} ms, p99 = {report['p99_ms']:.2f} ms, "
+          f"max = {report['max_ms']:.2f} ms, {report['throughput']:.0f} requests/s")
+
+
+def _solvers(args):
+    from transport.registry import SOLVERS, STAGE_SEPARATOR, STAGES
+
+    print("Solvers: " + ", ".join(sorted(SOLVERS)))
+    print("Stages: " + ", ".join(sorted(STAGES)))
+    print(f"Chain stages after a solver with '{STAGE_SEPARATOR}', e.g. vogel{STAGE_SEPARATOR}modi")
+
+
+def _add_address(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Unix socket path instead of TCP")
+    parser.add_argument("--stream-limit", type=int, default=None,
+                        help="longest request or response line in bytes (default: 64 MiB)")
+
+
+def build_parser():
+    from transport.results import FLUSH_EVERY
+
+    parser = argparse.ArgumentParser(prog="python -m transport", description="Transportation problem solvers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    instance_sets = "instance directory or one of simple, FCD, FCR"
+
+    solve = commands.add_parser("solve", help="solve one instance file")
+    solve.add_argument("file")
+    solve.add_argument("-s", "--solver", default="vogel", help="solver with optional stages, e.g. vogel+modi")
+    solve.add_argument("-a", "--allocation", action="store_true", help="print the allocated cells")
+    solve.add_argument("-p", "--profile", action="store_true", help="print phase timers and counters")
+    solve.add_argument("-t", "--trace", type=int, default=0, help="also print the last N steps")
+    solve.add_argument("--dummy", action="store_true",
+                       help="close an unbalanced instance with a virtual zero-cost depot or retailer")
+    solve.set_defaults(run=_solve)
+
+    batch = commands.add_parser("batch", help="run a solver over a directory of instances in parallel")
+    batch.add_argument("solver", help="solver with optional stages, e.g. vogel+modi")
+    batch.add_argument("instances", help=instance_sets)
+    batch.add_argument("-o", "--output", default="results.csv")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    batch.add_argument("-c", "--chunksize", type=int, default=1, help="instances sent to a worker at a time")
+    batch.add_argument("--resume", action="store_true", help="skip instances already in the output file")
+    batch.add_argument("--flush-every", type=int, default=FLUSH_EVERY, help="rows written between flushes")
+    batch.add_argument("--stacked", action="store_true",
+                       help="solve same-shape instances together with the stacked engines (nwc, min-matrix)")
+    batch.set_defaults(run=_batch)
+
+    compare = commands.add_parser("compare", help="compare MODI pivots from the NWC, Vogel and minimum-matrix starts")
+    compare.add_argument("instances", help=instance_sets)
+    compare.set_defaults(run=_compare)
+
+    serve = commands.add_parser("serve", help="serve JSON-line solve requests from a warm process pool")
+    _add_address(serve)
+    serve.add_argument("--stdio", action="store_true", help="read requests from stdin, answer on stdout")
+    serve.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    serve.add_argument("--max-batch", type=int, default=None, help="requests sent to a worker at a time (default: 32)")
+    serve.add_argument("--batch-window", type=float, default=None,
+                       help="seconds to wait for a batch to fill (default: 0.002)")
+    serve.set_defaults(run=_serve)
+
+    load = commands.add_parser("load", help="measure the latency of a running service")
+    load.add_argument("instances", help=instance_sets)
+    _add_address(load)
+    load.add_argument("-s", "--solver", default="nwc", help="solver with optional stages, e.g. vogel+modi")
+    load.add_argument("-n", "--repeat", type=int, default=10, help="times every instance is sent")
+    load.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    load.add_argument("--inline", action="store_true", help="send the instance data instead of its path")
+    load.add_argument("--no-allocation", action="store_true", help="ask for the cost only")
+    load.set_defaults(run=_load)
+
+    # Options after `bench` and `generate` are passed on to their modules
+    commands.add_parser("bench", help="benchmark the solvers across a size grid (see bench --help)", add_help=False)
+    commands.add_parser("generate", help="write seeded instances (see generate --help)", add_help=False)
+
+    solvers = commands.add_parser("solvers", help="list the registered solvers and stages")
+    solvers.set_defaults(run=_solvers)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, options = parser.parse_known_args(argv)
+    if args.command == 'bench':
+        from transport.bench import main as bench_main
+
+        bench_main(options)
+        return
+    if args.command == 'generate':
+        from transport.generate import main as generate_main
+
+        generate_main(options)
+        return
+    if options:
+        parser.error(f"unrecognized arguments: {' '.join(options)}")
+    args.run(args)
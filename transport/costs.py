@@ -0,0 +1,233 @@
+import os
+
+import numpy as np
+
+# Rows of a dense matrix read from disk at a time
+BLOCK_ROWS = 256
+
+
+# Cost matrix of allowed arcs in CSR form. Missing arcs are forbidden routes: the
+# engines skip them instead of encoding them as huge costs, and only the allowed
+# arcs are ever held in memory (or memory-mapped, see load()).
+class SparseCosts:
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.int64)
+        self.shape = tuple(shape)
+        self.dtype = self.data.dtype
+        self._csc = None
+        self._keys = None
+
+    def __repr__(self):
+        return f"SparseCosts({self.nnz} arcs, shape={self.shape})"
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    # Build from (row, column, cost) triples; duplicates keep the last cost
+    @classmethod
+    def from_arcs(cls, rows, cols, costs, shape):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        costs = np.asarray(costs, dtype=np.int64)
+        order = np.lexsort((cols, rows))
+        rows, cols, costs = rows[order], cols[order], costs[order]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[:-1] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, costs = rows[keep], cols[keep], costs[keep]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, cols, costs, shape)
+
+    # Build from a dense (possibly memory-mapped) matrix read in row blocks.
+    # Cells equal to or above `forbidden` are dropped, as are cells where `mask` is False.
+    @classmethod
+    def from_dense(cls, matrix, forbidden=None, mask=None, block_rows=BLOCK_ROWS):
+        d, r = matrix.shape
+        indptr = np.zeros(d + 1, dtype=np.int64)
+        indices, data = [], []
+        for start in range(0, d, block_rows):
+            block = np.asarray(matrix[start:start + block_rows])
+            allowed = np.ones(block.shape, dtype=bool)
+            if forbidden is not None:
+                allowed &= block < forbidden
+            if mask is not None:
+                allowed &= np.asarray(mask[start:start + block_rows], dtype=bool)
+            rows, cols = np.nonzero(allowed)
+            indices.append(cols)
+            data.append(block[rows, cols])
+            indptr[start + 1:start + len(block) + 1] = np.cumsum(allowed.sum(axis=1))
+            indptr[start + 1:start + len(block) + 1] += indptr[start]
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        data = np.concatenate(data) if data else np.zeros(0, dtype=np.int64)
+        return cls(indptr, indices, data, (d, r))
+
+    # Row index of every stored arc
+    def arc_rows(self):
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    # Allowed columns and costs of row i
+    def row(self, i):
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop], self.data[start:stop]
+
+    # Allowed rows and costs of column j (from a CSC copy built on first use)
+    def col(self, j):
+        if self._csc is None:
+            order = np.argsort(self.indices, kind='stable')
+            colptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=colptr[1:])
+            self._csc = (colptr, self.arc_rows()[order], self.data[order])
+        colptr, rows, data = self._csc
+        return rows[colptr[j]:colptr[j + 1]], data[colptr[j]:colptr[j + 1]]
+
+    # Position of each (row, col) arc in the CSR arrays, -1 when forbidden
+    def find(self, rows, cols):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        if self.nnz == 0:
+            return np.full(rows.shape, -1, dtype=np.int64)
+        if self._keys is None:
+            self._keys = self.arc_rows() * self.shape[1] + self.indices
+        keys = rows * self.shape[1] + cols
+        positions = np.minimum(np.searchsorted(self._keys, keys), self.nnz - 1)
+        return np.where(self._keys[positions] == keys, positions, -1)
+
+    # Costs of the given cells; forbidden cells raise
+    def gather(self, rows, cols):
+        positions = self.find(rows, cols)
+        if np.any(positions < 0):
+            raise ValueError("The solution uses a forbidden route.")
+        return self.data[positions]
+
+    def __getitem__(self, cell):
+        rows, cols = cell
+        values = self.gather(np.atleast_1d(rows), np.atleast_1d(cols))
+        return values[0] if np.ndim(rows) == 0 and np.ndim(cols) == 0 else values
+
+    def save(self, directory, prefix):
+        for part in ('indptr', 'indices', 'data'):
+            np.save(os.path.join(directory, f"{prefix}.{part}.npy"), getattr(self, part))
+
+    @classmethod
+    def load(cls, directory, prefix, shape, mmap_mode='r'):
+        parts = [np.load(os.path.join(directory, f"{prefix}.{part}.npy"), mmap_mode=mmap_mode)
+                 for part in ('indptr', 'indices', 'data')]
+        return cls(*parts, shape)
+
+
+# (rows, cols) of every cell of a cost matrix in ascending cost order (row-major on
+# ties), at most `block` cells at a time.
+# A dense (possibly memory-mapped) Cjk is sorted `block_rows` rows at a time and the
+# sorted blocks are merged lazily (see _merge_sorted), so only a 32-bit position per cell
+# is kept and a sweep that stops early never orders the rest. A SparseCosts is sorted
+# as a whole, being only its allowed arcs.
+# `dummy_row` / `dummy_col` add the zero-cost cells of a virtual row d or column r
+# (see transport.balance) where they would sort in the padded matrix: between the
+# negative and the positive costs, row-major among the real zero-cost cells. The
+# matrix itself is not padded; the dummy line is one more sorted source of the merge.
+def sorted_cells(Cjk, block, dummy_row=False, dummy_col=False, block_rows=BLOCK_ROWS):
+    d, r = Cjk.shape
+    width = r + 1 if dummy_col else r  # Row-major position in the padded matrix
+    if isinstance(Cjk, SparseCosts):
+        sources = [_SortedCells(Cjk.data, np.argsort(Cjk.data, kind='stable'), Cjk.arc_rows(), Cjk.indices, width)]
+    else:
+        sources = []
+        for start in range(0, d, block_rows):
+            values = np.asarray(Cjk[start:start + block_rows])
+            order = np.argsort(values, axis=None, kind='stable').astype(_position_type(values.size))
+            sources.append(_SortedCells(Cjk, order, None, None, width, start))
+    if dummy_col:
+        sources.append(_SortedCells(None, None, np.arange(d), np.full(d, r), width))
+    if dummy_row:
+        sources.append(_SortedCells(None, None, np.full(r, d), np.arange(r), width))
+    # Without a dummy line the runs are row blocks in row order, so equal costs already
+    # come out in position order from a stable sort on the cost alone
+    yield from _merge_sorted([source for source in sources if len(source)], block, dummy_row or dummy_col)
+
+
+# Smallest signed integer type holding the positions 0..size-1
+def _position_type(size):
+    return np.int32 if size <= np.iinfo(np.int32).max else np.int64
+
+
+# One sorted run of cells for _merge_sorted. `order` lists the run in ascending cost
+# order, as positions into `rows` / `cols` (arrays, or row-major positions in a block of
+# dense rows starting at `row_start` when they are None) and into `costs` (an array for
+# sparse arcs, the dense matrix itself, or None for the zero-cost dummy line).
+class _SortedCells:
+    def __init__(self, costs, order, rows, cols, width, row_start=0):
+        self.costs = costs
+        self.order = order
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.row_start = row_start
+
+    def __len__(self):
+        return len(self.rows) if self.order is None else len(self.order)
+
+    # (costs, padded positions, rows, cols) of the cells lo..hi of the run
+    def chunk(self, lo, hi):
+        if self.order is None:
+            rows, cols = self.rows[lo:hi], self.cols[lo:hi]
+            costs = np.zeros(len(rows), dtype=np.int64)
+        elif self.rows is None:
+            rows, cols = np.divmod(self.order[lo:hi].astype(np.int64), self.costs.shape[1])
+            rows += self.row_start
+            costs = np.asarray(self.costs[rows, cols])
+        else:
+            positions = self.order[lo:hi]
+            rows, cols, costs = self.rows[positions], self.cols[positions], self.costs[positions]
+        return costs, rows * self.width + cols, rows, cols
+
+
+# Lazy k-way merge of sorted runs by (cost, padded position), a strict order matching a
+# stable sort of the padded matrix. Each round reads the next `block` cells of every run;
+# the smallest of their last keys bounds what is final, so every run gives up the cells
+# up to it (at most `block`, all of them for the run that set the bound) and those are
+# sorted together and yielded. With `interleaved=False` the runs must not overlap in
+# position order (runs listed in position order), and ties are settled by the run order.
+def _merge_sorted(sources, block, interleaved=True):
+    cursors = [0] * len(sources)
+    while True:
+        chunks = [(k, sources[k].chunk(cursors[k], cursors[k] + block))
+                  for k in range(len(sources)) if cursors[k] < len(sources[k])]
+        if not chunks:
+            return
+        bound_cost, bound_key = min((costs[-1].item(), keys[-1].item()) for _, (costs, keys, _, _) in chunks)
+        parts = []
+        for k, (costs, keys, rows, cols) in chunks:
+            take = int(np.count_nonzero((costs < bound_cost) | ((costs == bound_cost) & (keys <= bound_key))))
+            cursors[k] += take
+            parts.append((costs[:take], keys[:take], rows[:take], cols[:take]))
+        costs, keys, rows, cols = (np.concatenate(columns) for columns in zip(*parts))
+        order = np.lexsort((keys, costs)) if interleaved else np.argsort(costs, kind='stable')
+        rows, cols = rows[order], cols[order]
+        for start in range(0, len(order), block):
+            yield rows[start:start + block], cols[start:start + block]
+
+
+# Sorted entries of every row (kind 0) or column (kind 1) of a cost matrix as
+# (others, costs) pairs, yielded one line at a time. Dense matrices are read in blocks
+# of rows or columns so a memory-mapped Cjk is never loaded whole at once; `others` is
+# then a 32-bit view into the block's sort and `costs` a view into a temporary sorted
+# copy of the block, freed once the caller drops it.
+def sorted_lines(Cjk, kind, block_rows=BLOCK_ROWS):
+    if isinstance(Cjk, SparseCosts):
+        for line in range(Cjk.shape[kind]):
+            others, costs = Cjk.row(line) if kind == 0 else Cjk.col(line)
+            order = np.argsort(costs, kind='stable')
+            yield others[order], costs[order]
+        return
+
+    for start in range(0, Cjk.shape[kind], block_rows):
+        if kind == 0:
+            block = np.asarray(Cjk[start:start + block_rows])
+        else:
+            block = np.asarray(Cjk[:, start:start + block_rows]).T
+        order = np.argsort(block, axis=1, kind='stable')
+        costs = np.take_along_axis(block, order, axis=1)
+        yield from zip(order.astype(_position_type(block.shape[1])), costs)
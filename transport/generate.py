@@ -0,0 +1,282 @@
+import argparse
+import math
+import os
+import shutil
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from transport.cache import ARRAY_KEYS, publish_entry, write_meta
+from transport.instances import Instance
+
+VARIANTS = ('simple', 'FCD', 'FCR')
+DISTRIBUTIONS = ('uniform', 'normal', 'euclidean')
+
+# Value ranges of the Lab01 instances
+DEMAND_RANGE = (10, 100)
+COST_RANGE = (30, 90)
+DEPOT_CHARGE_RANGE = (1800, 2400)
+ROUTE_CHARGE_RANGE = (300, 900)
+
+# Matrix rows drawn from one random stream. Fixed, so the values never depend on how
+# many workers produced them.
+GENERATOR_BLOCK = 256
+
+# Random streams of an instance
+_VECTORS, _COSTS, _CHARGES = range(3)
+
+HEADER = """/*********************************************
+    * {title}
+    * Author: transport.generate
+    * Generated instance, seed {seed}
+    *********************************************/
+"""
+
+
+# Everything that determines a generated instance.
+# `distribution` shapes Cjk within `cost_range`: 'uniform', 'normal' (centered on the
+# range, clipped to it) or 'euclidean' (distances between random depot and customer
+# points, scaled onto the range). Total supply is total demand times (1 + excess):
+# 0 gives a balanced instance, a negative excess a supply shortfall.
+# Vectors are drawn up front (O(d + r)); matrix rows come block by block from their
+# own seeded streams, so no d x r array is needed to write an instance.
+# The default name holds every field of the spec: shape, seed, distribution, excess,
+# cost range and the variant (last, as write_instance reads it back).
+class InstanceSpec:
+    def __init__(self, d, r, seed=0, variant='simple', distribution='uniform', excess=0.05,
+                 cost_range=COST_RANGE, name=None):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown variant '{variant}'. Choose one of {VARIANTS}.")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}'. Choose one of {DISTRIBUTIONS}.")
+        self.d = d
+        self.r = r
+        self.seed = seed
+        self.variant = variant
+        self.distribution = distribution
+        self.excess = excess
+        self.cost_range = tuple(cost_range)
+        self.name = name or (f"generated_{d}x{r}_{seed:02d}_{distribution}_e{float(excess)!r}"
+                             f"_c{self.cost_range[0]}-{self.cost_range[1]}_{variant}")
+        self._vectors = None
+
+    def __repr__(self):
+        return f"InstanceSpec({self.name!r}, d={self.d}, r={self.r})"
+
+    def _rng(self, stream, block=0):
+        return np.random.default_rng([self.seed, self.d, self.r, stream, block])
+
+    # (SCj, Dk, Fj, points) with Fj only for FCD and points only for 'euclidean'
+    def vectors(self):
+        if self._vectors is None:
+            rng = self._rng(_VECTORS)
+            Dk = rng.integers(*DEMAND_RANGE, size=self.r, endpoint=True)
+            total = math.ceil(int(Dk.sum()) * (1 + self.excess))
+            weights = rng.uniform(0.9, 1.1, size=self.d)
+            SCj = np.floor(total * weights / weights.sum()).astype(np.int64)
+            SCj[:total - int(SCj.sum())] += 1
+            Fj = rng.integers(*DEPOT_CHARGE_RANGE, size=self.d, endpoint=True) if self.variant == 'FCD' else None
+            points = None
+            if self.distribution == 'euclidean':
+                points = (rng.uniform(0, 1, size=(self.d, 2)), rng.uniform(0, 1, size=(self.r, 2)))
+            self._vectors = (SCj, Dk, Fj, points)
+        return self._vectors
+
+    @property
+    def blocks(self):
+        return (self.d + GENERATOR_BLOCK - 1) // GENERATOR_BLOCK
+
+    # Rows [block * GENERATOR_BLOCK, ...) of Cjk
+    def cost_block(self, block):
+        start = block * GENERATOR_BLOCK
+        n = min(GENERATOR_BLOCK, self.d - start)
+        low, high = self.cost_range
+        rng = self._rng(_COSTS, block)
+        if self.distribution == 'uniform':
+            return rng.integers(low, high, size=(n, self.r), endpoint=True)
+        if self.distribution == 'normal':
+            values = rng.normal((low + high) / 2, (high - low) / 6, size=(n, self.r))
+            return np.clip(np.rint(values), low, high).astype(np.int64)
+        depots, customers = self.vectors()[3]
+        offsets = depots[start:start + n, None, :] - customers[None, :, :]
+        distances = np.hypot(offsets[..., 0], offsets[..., 1])
+        return (low + np.rint(distances / math.sqrt(2) * (high - low))).astype(np.int64)
+
+    # Rows of Fjk (FCR only)
+    def charge_block(self, block):
+        n = min(GENERATOR_BLOCK, self.d - block * GENERATOR_BLOCK)
+        return self._rng(_CHARGES, block).integers(*ROUTE_CHARGE_RANGE, size=(n, self.r), endpoint=True)
+
+    # Matrices stored by this variant and the functions producing their blocks
+    def matrices(self):
+        matrices = {'Cjk': self.cost_block}
+        if self.variant == 'FCR':
+            matrices['Fjk'] = self.charge_block
+        return matrices
+
+    # The whole instance in memory
+    def build(self):
+        SCj, Dk, Fj, _ = self.vectors()
+        full = {}
+        for key, block_of in self.matrices().items():
+            blocks = [block_of(block) for block in range(self.blocks)]
+            full[key] = np.concatenate(blocks) if blocks else np.zeros((0, self.r), dtype=np.int64)
+        return Instance(self.name, self.d, self.r, SCj, Dk, full['Cjk'], Fj=Fj, Fjk=full.get('Fjk'))
+
+
+# Seeded random instance in the style of the Lab01 sets, built in memory.
+# The same arguments always give the same instance.
+def generate_instance(d, r, seed=0, variant='simple', excess=0.05, distribution='uniform'):
+    return InstanceSpec(d, r, seed, variant, distribution, excess).build()
+
+
+# Write an in-memory instance in the .dat format, one matrix row per line
+def write_instance(instance, file_path, seed=0):
+    variant = instance.name.rsplit('_', 1)[-1]
+    with open(file_path, 'w') as f:
+        _write_head(f, instance.name, variant, seed, instance.d, instance.r, instance.SCj, instance.Dk, instance.Fj)
+        _write_matrix(f, 'Cjk', [_format_rows(instance.Cjk)])
+        if instance.Fjk is not None:
+            _write_matrix(f, 'Fjk', [_format_rows(instance.Fjk)])
+
+
+# Stream a spec to a .dat file, one block of rows at a time. With `workers` > 1 the
+# blocks are generated and formatted on a process pool while this process writes
+# them in order; at most 2 * workers blocks are in flight.
+def write_dat(spec, file_path, workers=1):
+    SCj, Dk, Fj, _ = spec.vectors()
+    with open(file_path, 'w') as f:
+        _write_head(f, spec.name, spec.variant, spec.seed, spec.d, spec.r, SCj, Dk, Fj)
+        for key in spec.matrices():
+            _write_matrix(f, key, _formatted_blocks(spec, key, workers))
+
+
+# Write a spec straight into the binary cache layout (one .npy per array plus
+# meta.json, see transport.cache), filling the matrices block by block through
+# memory-mapped .npy files. The entry opens with transport.cache.load_entry.
+def write_binary(spec, entry_dir):
+    parent = os.path.dirname(os.path.abspath(entry_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        SCj, Dk, Fj, _ = spec.vectors()
+        arrays = []
+        for key, value in (('SCj', SCj), ('Dk', Dk), ('Fj', Fj)):
+            if value is not None:
+                np.save(os.path.join(tmp_dir, key + '.npy'), np.asarray(value, dtype=np.int64))
+                arrays.append(key)
+        for key, block_of in spec.matrices().items():
+            matrix = np.lib.format.open_memmap(os.path.join(tmp_dir, key + '.npy'), mode='w+',
+                                               dtype=np.int64, shape=(spec.d, spec.r))
+            for block in range(spec.blocks):
+                start = block * GENERATOR_BLOCK
+                matrix[start:start + GENERATOR_BLOCK] = block_of(block)
+            matrix.flush()
+            del matrix
+            arrays.append(key)
+        write_meta(tmp_dir, spec.name, spec.d, spec.r, sorted(arrays, key=ARRAY_KEYS.index))
+        publish_entry(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+# Write one spec per file into `directory`, several files at a time on a process pool.
+# `binary=True` writes cache entries (directories named after the instance) instead
+# of .dat files. Returns the written paths in the order of `specs`.
+# Specs sharing a name (given explicitly) would overwrite each other and are rejected.
+def generate_corpus(specs, directory, workers=None, binary=False):
+    paths = [os.path.join(directory, spec.name if binary else spec.name + '.dat') for spec in specs]
+    duplicates = sorted(path for path, count in Counter(paths).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Several specs would write {', '.join(duplicates)}.")
+    os.makedirs(directory, exist_ok=True)
+    write = write_binary if binary else write_dat
+    if workers == 1:
+        for spec, path in zip(specs, paths):
+            write(spec, path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(write, specs, paths))
+    return paths
+
+
+def _vector(values):
+    return '[' + ' '.join(map(str, np.asarray(values).tolist())) + ']'
+
+
+def _write_head(f, name, variant, seed, d, r, SCj, Dk, Fj):
+    f.write(HEADER.format(title=f"Lab01 - {variant}", seed=seed))
+    f.write(f'instance_name = "{name}";\n\n')
+    f.write(f"d = {d};\nr = {r};\n\n")
+    f.write(f"SCj = {_vector(SCj)};\n")
+    if Fj is not None:
+        f.write(f"Fj = {_vector(Fj)};\n")
+    f.write(f"Dk = {_vector(Dk)};\n\n")
+
+
+# Matrix rows as "[a b c]", one per line, continuation lines indented by a space
+def _format_rows(matrix):
+    return '\n '.join(_vector(row) for row in np.asarray(matrix))
+
+
+def _format_block(spec, key, block):
+    return _format_rows(spec.matrices()[key](block))
+
+
+def _formatted_blocks(spec, key, workers):
+    if workers is None or workers <= 1:
+        for block in range(spec.blocks):
+            yield _format_block(spec, key, block)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for block in range(spec.blocks):
+            pending.append(executor.submit(_format_block, spec, key, block))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_matrix(f, key, chunks):
+    f.write(f"{key} = [")
+    for k, chunk in enumerate(chunks):
+        f.write(('\n ' if k else '') + chunk)
+    f.write('];\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m transport generate",
+                                     description="Generate seeded transportation instances.")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("-d", type=int, required=True, help="number of depots")
+    parser.add_argument("-r", type=int, required=True, help="number of retailers")
+    parser.add_argument("-n", "--count", type=int, default=1, help="instances, with seeds seed .. seed + n - 1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variant", default="simple", choices=VARIANTS)
+    parser.add_argument("--distribution", default="uniform", choices=DISTRIBUTIONS)
+    parser.add_argument("--cost-range", type=int, nargs=2, default=COST_RANGE, metavar=("LOW", "HIGH"))
+    parser.add_argument("--excess", type=float, default=0.05,
+                        help="supply over demand as a fraction (0 = balanced, < 0 = shortfall)")
+    parser.add_argument("--binary", action="store_true", help="write cache entries instead of .dat files")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    specs = [InstanceSpec(args.d, args.r, seed, args.variant, args.distribution, args.excess, args.cost_range)
+             for seed in range(args.seed, args.seed + args.count)]
+    if len(specs) == 1 and not args.binary:
+        # A single file: parallelize over its blocks instead
+        os.makedirs(args.directory, exist_ok=True)
+        paths = [os.path.join(args.directory, specs[0].name + '.dat')]
+        write_dat(specs[0], paths[0], args.workers or os.cpu_count())
+    else:
+        paths = generate_corpus(specs, args.directory, args.workers, args.binary)
+    for path in paths:
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
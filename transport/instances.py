@@ -0,0 +1,162 @@
+import re
+
+import numpy as np
+
+# Size of the blocks read from disk; instance files are never loaded whole
+CHUNK_SIZE = 1 << 20
+
+# Vector keys and the dimension they are preallocated with
+VECTOR_KEYS = {'SCj': 'd', 'Fj': 'd', 'Dk': 'r'}
+# Matrix keys, preallocated as d x r
+MATRIX_KEYS = ('Cjk', 'Fjk')
+
+# Brackets and line breaks are plain separators inside a numeric block
+_SEPARATORS = bytes.maketrans(b'[]\n\r\t', b'     ')
+_NAME_PATTERN = re.compile(rb'instance_name\s*=\s*"([^"]*)"')
+
+
+# A parsed transportation instance (simple, FCD or FCR variant)
+class Instance:
+    def __init__(self, name, d, r, SCj, Dk, Cjk, Fj=None, Fjk=None):
+        self.name = name
+        self.d = d
+        self.r = r
+        self.SCj = SCj
+        self.Dk = Dk
+        self.Cjk = Cjk
+        self.Fj = Fj  # Fixed cost per depot (FCD instances only)
+        self.Fjk = Fjk  # Fixed cost per route (FCR instances only)
+
+    def __repr__(self):
+        return f"Instance({self.name!r}, d={self.d}, r={self.r})"
+
+
+# Parse a .dat instance file in a single streaming pass.
+# Statements are found by key name (`key = value;`), not by line position, and the
+# numeric blocks are read straight into preallocated int64 arrays chunk by chunk.
+def read_instance(file_path, chunk_size=CHUNK_SIZE):
+    scalars = {}
+    arrays = {}
+    key = None
+    target = None  # Preallocated array for the key being read, None for scalars
+    filled = 0
+    scalar = b''
+    carry = b''
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = carry + chunk
+            carry = b''
+            pos, n = 0, len(buf)
+
+            while pos < n:
+                if key is None:
+                    # Skip whitespace and comments, then read `name =`
+                    while pos < n and buf[pos:pos + 1].isspace():
+                        pos += 1
+                    if pos == n:
+                        break
+                    if buf.startswith(b'/*', pos) or buf.startswith(b'//', pos):
+                        closing = b'*/' if buf[pos + 1] == ord('*') else b'\n'
+                        end = buf.find(closing, pos + 2)
+                        if end == -1:
+                            carry = buf[pos:]
+                            break
+                        pos = end + len(closing)
+                        continue
+                    eq = buf.find(b'=', pos)
+                    if eq == -1:
+                        carry = buf[pos:]
+                        break
+                    key = buf[pos:eq].strip().decode()
+                    target = _allocate(key, scalars, file_path)
+                    filled = 0
+                    scalar = b''
+                    pos = eq + 1
+                    continue
+
+                semi = buf.find(b';', pos)
+                complete = semi != -1
+                segment = buf[pos:semi] if complete else buf[pos:]
+                pos = semi + 1 if complete else n
+
+                if target is None:
+                    scalar += segment
+                else:
+                    segment = segment.translate(_SEPARATORS)
+                    if not complete and not eof:
+                        # A number may continue in the next chunk
+                        cut = segment.rfind(b' ') + 1
+                        carry = segment[cut:]
+                        segment = segment[:cut]
+                    filled = _fill(target, filled, segment, key, file_path)
+
+                if complete:
+                    if target is None:
+                        scalars[key] = scalar.strip().decode()
+                    else:
+                        if filled != target.size:
+                            raise ValueError(f"Size mismatch in {key} for {file_path}. "
+                                             f"Expected {target.size}, got {filled}.")
+                        arrays[key] = target
+                    key = None
+                    target = None
+
+            if eof:
+                break
+
+    if key is not None:
+        raise ValueError(f"Unterminated statement '{key}' in {file_path}.")
+    for required in ('instance_name', 'd', 'r'):
+        if required not in scalars:
+            raise ValueError(f"Missing '{required}' in {file_path}.")
+    for required in ('SCj', 'Dk', 'Cjk'):
+        if required not in arrays:
+            raise ValueError(f"Missing '{required}' in {file_path}.")
+
+    d, r = int(scalars['d']), int(scalars['r'])
+    return Instance(
+        scalars['instance_name'].strip('"'), d, r,
+        arrays['SCj'], arrays['Dk'], arrays['Cjk'].reshape(d, r),
+        Fj=arrays.get('Fj'),
+        Fjk=arrays['Fjk'].reshape(d, r) if 'Fjk' in arrays else None,
+    )
+
+
+# Read only the `instance_name` statement from the top of a file.
+# Cheap enough to decide whether a file needs solving without parsing its matrices.
+def read_instance_name(file_path, header_size=4096):
+    with open(file_path, 'rb') as f:
+        match = _NAME_PATTERN.search(f.read(header_size))
+    if match is None:
+        raise ValueError(f"Missing 'instance_name' in the header of {file_path}.")
+    return match.group(1).decode()
+
+
+# Preallocate the array for a vector or matrix key, None for scalar keys
+def _allocate(key, scalars, file_path):
+    if key in VECTOR_KEYS:
+        dim = VECTOR_KEYS[key]
+        if dim not in scalars:
+            raise ValueError(f"'{key}' appears before '{dim}' in {file_path}.")
+        return np.empty(int(scalars[dim]), dtype=np.int64)
+    if key in MATRIX_KEYS:
+        if 'd' not in scalars or 'r' not in scalars:
+            raise ValueError(f"'{key}' appears before 'd' and 'r' in {file_path}.")
+        return np.empty(int(scalars['d']) * int(scalars['r']), dtype=np.int64)
+    return None
+
+
+# Convert a whitespace separated block of integers into target[filled:]
+def _fill(target, filled, segment, key, file_path):
+    if not segment.strip():
+        return filled
+    values = np.loadtxt([segment], dtype=np.int64, ndmin=1)
+    end = filled + values.size
+    if end > target.size:
+        raise ValueError(f"Size mismatch in {key} for {file_path}. "
+                         f"Expected {target.size}, got more.")
+    target[filled:end] = values
+    return end
@@ -0,0 +1,48 @@
+import time
+from collections import deque, namedtuple
+
+# One allocation step; `key` is what the step was chosen by (the Vogel penalty, the
+# minimum-matrix cost, the MODI reduced cost) or None
+TraceStep = namedtuple('TraceStep', 'iteration row col amount key')
+
+
+# Optional instrumentation passed to the engines as `probe=`.
+# Engines only touch the probe behind `if probe is not None`, so a run without one
+# pays a single comparison per hook. Phase timers accumulate perf_counter_ns; the
+# phases used are 'sort', 'penalty', 'selection' and 'allocation' (plus 'pricing'
+# and 'pivot' for MODI). With `trace_size` > 0 the last `trace_size` steps are kept
+# in a ring buffer.
+class Probe:
+    def __init__(self, trace_size=0):
+        self.timers = {}
+        self.counters = {}
+        self.trace = deque(maxlen=trace_size) if trace_size > 0 else None
+
+    @staticmethod
+    def clock():
+        return time.perf_counter_ns()
+
+    # Charge the time since `start` to a phase; returns the current clock so calls chain
+    def add_time(self, phase, start):
+        now = time.perf_counter_ns()
+        self.timers[phase] = self.timers.get(phase, 0) + now - start
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, iteration, row, col, amount, key=None):
+        if self.trace is not None:
+            self.trace.append(TraceStep(iteration, row, col, amount, key))
+
+    def report(self):
+        return {
+            'timers_ms': {phase: ns / 1e6 for phase, ns in self.timers.items()},
+            'counters': dict(self.counters),
+            'trace': [step._asdict() for step in self.trace] if self.trace is not None else [],
+        }
+
+    def __str__(self):
+        lines = [f"{phase:>12}: {ns / 1e6:10.3f} ms" for phase, ns in self.timers.items()]
+        lines += [f"{name:>12}: {value}" for name, value in self.counters.items()]
+        return '\n'.join(lines)
@@ -0,0 +1,374 @@
+import heapq
+
+import numpy as np
+
+from transport.allocation import Allocation
+from transport.balance import balance, split_dummy
+from transport.costs import SparseCosts, sorted_cells
+
+ENGINES = ('sorted', 'heap', 'fixed-charge', 'loop')
+
+# Cells of the sorted order checked against the exhausted rows/columns at a time
+SWEEP_BLOCK = 4096
+
+
+# Minimum matrix (least cost) method.
+# Returns (total_cost, allocation) with a sparse Allocation; the cost includes Fjk for
+# every route used. 'sorted', 'heap' and 'loop' pick the same cells (lowest Cjk,
+# row-major on ties); 'fixed-charge' ranks cells by their effective unit cost instead.
+# A SparseCosts Cjk (forbidden routes left out) is only handled by 'sorted'.
+# A Probe (transport.instrument) is filled by 'sorted' and 'fixed-charge'.
+# With `dummy=True` an unbalanced instance is closed by a virtual zero-cost row or
+# column (see transport.balance) instead of running out of supply: every engine then
+# picks the cells it would pick on the padded matrix, without padding Cjk (only the
+# 'loop' reference pads it).
+def solve_minimum_matrix_method(d, r, SCj, Dk, Cjk, Fjk, engine='sorted', probe=None, dummy=False):
+    total_cost, allocation, _ = minimum_matrix_method(d, r, SCj, Dk, Cjk, Fjk, engine, probe, dummy)
+    return total_cost, allocation
+
+
+# Same as solve_minimum_matrix_method, with the engine's iteration count as a third
+# value: the cells it allocated, dummy cells included
+def minimum_matrix_method(d, r, SCj, Dk, Cjk, Fjk, engine='sorted', probe=None, dummy=False):
+    if isinstance(Cjk, SparseCosts) and engine != 'sorted':
+        raise ValueError(f"The '{engine}' minimum matrix engine needs a dense cost matrix.")
+    if engine == 'sorted':
+        total_cost, allocation, iterations = minimum_matrix_sorted(SCj, Dk, Cjk, Fjk, probe, dummy)
+    elif engine == 'heap':
+        total_cost, allocation, iterations = minimum_matrix_heap(SCj, Dk, Cjk, Fjk, dummy=dummy)
+    elif engine == 'fixed-charge':
+        total_cost, allocation, iterations = minimum_matrix_fixed_charge(SCj, Dk, Cjk, Fjk, probe, dummy)
+    elif engine == 'loop' and dummy:
+        supply, demand = balance(SCj, Dk)
+        padding = ((0, len(supply) - d), (0, len(demand) - r))
+        total_cost, allocation = minimum_matrix_loop(len(supply), len(demand), supply, demand,
+                                                     np.pad(Cjk, padding), np.pad(Fjk, padding))
+        rows, cols = np.nonzero(allocation)
+        allocation = split_dummy(rows, cols, allocation[rows, cols], (d, r))
+        iterations = len(rows)
+    elif engine == 'loop':
+        total_cost, allocation = minimum_matrix_loop(d, r, SCj, Dk, Cjk, Fjk)
+        allocation = Allocation.from_dense(allocation)
+        iterations = len(allocation)
+    else:
+        raise ValueError(f"Unknown minimum matrix engine '{engine}'. Choose one of {ENGINES}.")
+    return total_cost, allocation, iterations
+
+
+# Reference implementation: rescans the whole matrix for every allocation
+def minimum_matrix_loop(d, r, SCj, Dk, Cjk, Fjk):
+    allocation = np.zeros((d, r), dtype=int)
+    total_cost = 0
+    remaining_SCj = SCj.copy()
+    remaining_Dk = Dk.copy()
+
+    while np.sum(remaining_Dk) > 0:
+        min_cost = float('inf')
+        min_i, min_j = -1, -1
+        for i in range(d):
+            for j in range(r):
+                if remaining_SCj[i] > 0 and remaining_Dk[j] > 0 and Cjk[i][j] < min_cost:
+                    min_cost = Cjk[i][j]
+                    min_i, min_j = i, j
+
+        if min_i == -1 or min_j == -1:
+            raise ValueError("Allocation not possible with current data.")
+
+        allocation_amount = min(remaining_SCj[min_i], remaining_Dk[min_j])
+        allocation[min_i][min_j] = allocation_amount
+        total_cost += allocation_amount * Cjk[min_i][min_j] + Fjk[min_i][min_j]
+        remaining_SCj[min_i] -= allocation_amount
+        remaining_Dk[min_j] -= allocation_amount
+
+    return total_cost, allocation
+
+
+# Single-pass engine: sort the cells once by Cjk and sweep that order.
+# Cells whose row or column is already exhausted are skipped; they are filtered a
+# block at a time with NumPy so the Python loop only sees live candidates. With a
+# SparseCosts Cjk only the allowed arcs are sorted and swept.
+# Returns (total_cost, allocation, iterations). O(dr log dr) overall.
+# With a Probe, producing the sorted blocks is timed as 'sort', the block filter as
+# 'selection' and the allocations as 'allocation'.
+# With `dummy=True` the zero-cost cells of the dummy line are merged into the sorted
+# order (see sorted_cells) and the sweep runs on the balanced vectors.
+def minimum_matrix_sorted(SCj, Dk, Cjk, Fjk=None, probe=None, dummy=False):
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.array(SCj, dtype=np.int64)
+        demand = np.array(Dk, dtype=np.int64)
+    d, r = len(SCj), len(Dk)
+    row_open = supply > 0
+    col_open = demand > 0
+    remaining_demand = int(demand.sum())
+
+    rows, cols, amounts = [], [], []
+    if probe is not None:
+        start = probe.clock()
+    for block_rows, block_cols in sorted_cells(Cjk, SWEEP_BLOCK, len(supply) > d, len(demand) > r):
+        if remaining_demand == 0:
+            break
+        if probe is not None:
+            start = probe.add_time('sort', start)
+        live = row_open[block_rows] & col_open[block_cols]
+        if probe is not None:
+            start = probe.add_time('selection', start)
+            probe.count('cells_scanned', len(block_rows))
+            probe.count('candidates', int(np.count_nonzero(live)))
+        for i, j in zip(block_rows[live].tolist(), block_cols[live].tolist()):
+            if not (row_open[i] and col_open[j]):
+                continue  # Exhausted earlier in this block
+            amount = min(supply[i], demand[j])
+            rows.append(i)
+            cols.append(j)
+            amounts.append(amount)
+            supply[i] -= amount
+            demand[j] -= amount
+            remaining_demand -= amount
+            if supply[i] == 0:
+                row_open[i] = False
+            if demand[j] == 0:
+                col_open[j] = False
+            if probe is not None:
+                probe.record(len(rows), i, j, int(amount))
+            if remaining_demand == 0:
+                break
+        if probe is not None:
+            start = probe.add_time('allocation', start)
+
+    if remaining_demand > 0:
+        raise ValueError("Allocation not possible with current data.")
+    if dummy:
+        allocation = split_dummy(rows, cols, amounts, (d, r))
+    else:
+        allocation = Allocation(rows, cols, amounts, (d, r))
+    return _total_cost(allocation, Cjk, Fjk), allocation, len(rows)
+
+
+# Lazily evaluated heap engine, for rankings that change while allocating.
+# `rank(rows, cols, supply, demand)` gives the current priority of cells (vectorized
+# over arrays, also called with scalars); by default the priority is Cjk. A popped
+# cell whose rank has grown since it was pushed is pushed back with the new rank, so
+# ranks must never decrease as supply and demand run down.
+# With `dummy=True` (default ranking only) the dummy cells enter the heap at cost 0;
+# cells are numbered row-major over the balanced shape so ties break as if padded.
+def minimum_matrix_heap(SCj, Dk, Cjk, Fjk=None, rank=None, dummy=False):
+    if dummy and rank is not None:
+        raise ValueError("A custom rank cannot price the dummy cells.")
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.array(SCj, dtype=np.int64)
+        demand = np.array(Dk, dtype=np.int64)
+    d, r = len(SCj), len(Dk)
+    width = len(demand)
+    remaining_demand = int(demand.sum())
+
+    all_rows, all_cols = np.divmod(np.arange(d * r), r)
+    if rank is None:
+        initial = np.asarray(Cjk).ravel()
+    else:
+        initial = rank(all_rows, all_cols, supply[all_rows], demand[all_cols])
+    heap = list(zip(initial.tolist(), (all_rows * width + all_cols).tolist()))
+    if len(demand) > r:
+        heap += [(0, i * width + r) for i in range(d)]
+    elif len(supply) > d:
+        heap += [(0, d * width + j) for j in range(r)]
+    heapq.heapify(heap)
+
+    rows, cols, amounts = [], [], []
+    while remaining_demand > 0:
+        if not heap:
+            raise ValueError("Allocation not possible with current data.")
+        priority, cell = heapq.heappop(heap)
+        i, j = divmod(cell, width)
+        if supply[i] == 0 or demand[j] == 0:
+            continue
+        if rank is not None:
+            current = rank(i, j, supply[i], demand[j])
+            if current > priority:
+                heapq.heappush(heap, (current.item() if hasattr(current, 'item') else current, cell))
+                continue
+
+        amount = min(supply[i], demand[j])
+        rows.append(i)
+        cols.append(j)
+        amounts.append(amount)
+        supply[i] -= amount
+        demand[j] -= amount
+        remaining_demand -= amount
+
+    if dummy:
+        allocation = split_dummy(rows, cols, amounts, (d, r))
+    else:
+        allocation = Allocation(rows, cols, amounts, (d, r))
+    return _total_cost(allocation, Cjk, Fjk), allocation, len(rows)
+
+
+# Fixed-charge-aware greedy.
+# Cells are ranked by the effective unit cost Cjk + Fjk / min(remaining supply,
+# remaining demand), i.e. the route's fixed charge spread over the largest amount it
+# could still carry. Each row's best cell sits in an indexed priority queue over rows.
+# An allocation at (i, j) only changes the denominators of row i and column j, so
+# only row i and the rows whose best cell is in column j are re-evaluated.
+# With a Probe, re-evaluating rows is timed as 'penalty'.
+# With `dummy=True` the dummy cells have no cost and no charge, so their effective
+# cost is 0; the dummy column sits after the real ones and the dummy row is row d.
+def minimum_matrix_fixed_charge(SCj, Dk, Cjk, Fjk=None, probe=None, dummy=False):
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.array(SCj, dtype=np.int64)
+        demand = np.array(Dk, dtype=np.int64)
+    d, r = len(SCj), len(Dk)
+    n_rows = len(supply)
+    if Fjk is None:
+        Fjk = np.zeros((d, r), dtype=np.int64)
+    open_cols = np.flatnonzero(demand > 0)
+    best_col = np.full(n_rows, -1, dtype=np.int64)
+    queue = IndexedHeap(n_rows)
+    remaining_demand = int(demand.sum())
+
+    def update_row(i):
+        if supply[i] == 0 or open_cols.size == 0:
+            queue.remove(i)
+            best_col[i] = -1
+            return
+        capacity = np.minimum(supply[i], demand[open_cols])
+        if i >= d:
+            effective = np.zeros(open_cols.size)
+        elif open_cols[-1] >= r:
+            effective = np.zeros(open_cols.size)
+            real = open_cols[:-1]
+            effective[:-1] = Cjk[i, real] + Fjk[i, real] / capacity[:-1]
+        else:
+            effective = Cjk[i, open_cols] + Fjk[i, open_cols] / capacity
+        k = np.argmin(effective)
+        best_col[i] = open_cols[k]
+        queue.push(i, (effective[k].item(), i, best_col[i].item()))
+        if probe is not None:
+            probe.count('cells_scanned', open_cols.size)
+            probe.count('penalties_recomputed')
+
+    if probe is not None:
+        start = probe.clock()
+    for i in range(n_rows):
+        update_row(i)
+    if probe is not None:
+        start = probe.add_time('penalty', start)
+
+    rows, cols, amounts = [], [], []
+    while remaining_demand > 0:
+        if not queue:
+            raise ValueError("Allocation not possible with current data.")
+        key, i, j = queue.peek()
+        if probe is not None:
+            start = probe.add_time('selection', start)
+        amount = min(supply[i], demand[j])
+        rows.append(i)
+        cols.append(j)
+        amounts.append(amount)
+        supply[i] -= amount
+        demand[j] -= amount
+        remaining_demand -= amount
+        if probe is not None:
+            start = probe.add_time('allocation', start)
+            probe.record(len(rows), i, j, int(amount), key)
+
+        if demand[j] == 0:
+            open_cols = open_cols[open_cols != j]
+        for k in np.flatnonzero(best_col == j).tolist():
+            if k != i:
+                update_row(k)
+        update_row(i)
+        if probe is not None:
+            start = probe.add_time('penalty', start)
+
+    if dummy:
+        allocation = split_dummy(rows, cols, amounts, (d, r))
+    else:
+        allocation = Allocation(rows, cols, amounts, (d, r))
+    return _total_cost(allocation, Cjk, Fjk), allocation, len(rows)
+
+
+# Binary min-heap over the items 0..n-1 whose keys can be changed in place
+class IndexedHeap:
+    def __init__(self, n):
+        self._heap = []
+        self._keys = [None] * n
+        self._pos = [-1] * n
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return self._pos[item] != -1
+
+    # Smallest key in the heap
+    def peek(self):
+        return self._keys[self._heap[0]]
+
+    # Insert an item or change its key
+    def push(self, item, key):
+        old = self._keys[item]
+        self._keys[item] = key
+        if self._pos[item] == -1:
+            self._pos[item] = len(self._heap)
+            self._heap.append(item)
+            self._sift_up(self._pos[item])
+        elif key < old:
+            self._sift_up(self._pos[item])
+        else:
+            self._sift_down(self._pos[item])
+
+    def remove(self, item):
+        pos = self._pos[item]
+        if pos == -1:
+            return
+        last = self._heap.pop()
+        self._pos[item] = -1
+        self._keys[item] = None
+        if pos < len(self._heap):
+            self._heap[pos] = last
+            self._pos[last] = pos
+            self._sift_up(pos)
+            self._sift_down(self._pos[last])
+
+    def _sift_up(self, pos):
+        heap, keys, positions = self._heap, self._keys, self._pos
+        item = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if keys[heap[parent]] <= keys[item]:
+                break
+            heap[pos] = heap[parent]
+            positions[heap[pos]] = pos
+            pos = parent
+        heap[pos] = item
+        positions[item] = pos
+
+    def _sift_down(self, pos):
+        heap, keys, positions = self._heap, self._keys, self._pos
+        n = len(heap)
+        item = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= n:
+                break
+            if child + 1 < n and keys[heap[child + 1]] < keys[heap[child]]:
+                child += 1
+            if keys[item] <= keys[heap[child]]:
+                break
+            heap[pos] = heap[child]
+            positions[heap[pos]] = pos
+            pos = child
+        heap[pos] = item
+        positions[item] = pos
+
+
+def _total_cost(allocation, Cjk, Fjk):
+    total_cost = allocation.cost(Cjk)
+    if Fjk is not None:
+        total_cost += allocation.fixed_cost(Fjk)
+    return total_cost
@@ -0,0 +1,286 @@
+import numpy as np
+
+from transport.allocation import Allocation
+from transport.costs import SparseCosts
+
+
+# Transportation simplex (MODI / u-v method) on a spanning-tree basis.
+# The basic cells form a spanning tree over the row nodes 0..R-1 and the column nodes
+# R..R+C-1, stored as parent/depth arrays with the flow of each tree edge kept on its
+# child node. After a pivot only the subtree that is cut off and re-attached changes,
+# so its potentials are shifted in place and the stepping-stone cycle is found by
+# walking both endpoints up to their common ancestor, O(d + r) per pivot.
+# Unbalanced instances get one virtual zero-cost row or column (R = d + 1 or
+# C = r + 1) that only exists as a tree node and a potential, never inside Cjk.
+# Only the linear Cjk cost is optimized; fixed charges are not modelled.
+# Pricing reads Cjk a block of rows at a time, so a SparseCosts Cjk is rejected.
+class TransportationSimplex:
+    def __init__(self, SCj, Dk, Cjk, allocation):
+        if isinstance(Cjk, SparseCosts):
+            raise ValueError("The MODI stage needs a dense cost matrix.")
+        self.supply = np.asarray(SCj, dtype=np.int64)
+        self.demand = np.asarray(Dk, dtype=np.int64)
+        self.Cjk = Cjk
+        self.d, self.r = len(self.supply), len(self.demand)
+        excess = int(self.supply.sum() - self.demand.sum())
+        self.n_rows = self.d + (excess < 0)  # Virtual row supplies missing demand
+        self.n_cols = self.r + (excess > 0)  # Virtual column absorbs spare supply
+        self.pivots = 0
+        self._next_block = 0
+
+        cells = self._spanning_cells(allocation)
+        self._build_tree(cells)
+
+    def _cost(self, i, j):
+        if i >= self.d or j >= self.r:
+            return 0
+        return self.Cjk[i, j].item()
+
+    # Cells of the allocation plus the virtual cells carrying what it left over,
+    # completed with zero cells into a spanning tree
+    def _spanning_cells(self, allocation):
+        d, r, n_rows, n_cols = self.d, self.r, self.n_rows, self.n_cols
+        cells = list(zip(allocation.rows.tolist(), allocation.cols.tolist(), allocation.amounts.tolist()))
+        left_supply = self.supply - np.bincount(allocation.rows, allocation.amounts, d).astype(np.int64)
+        left_demand = self.demand - np.bincount(allocation.cols, allocation.amounts, r).astype(np.int64)
+        if (left_supply < 0).any() or (left_demand < 0).any():
+            raise ValueError("The allocation ships more than the supply or demand allows.")
+        if n_cols > r:
+            cells += [(i, r, amount) for i, amount in enumerate(left_supply.tolist()) if amount > 0]
+        elif left_supply.any():
+            raise ValueError("The allocation leaves supply unshipped on a balanced instance.")
+        if n_rows > d:
+            cells += [(d, j, amount) for j, amount in enumerate(left_demand.tolist()) if amount > 0]
+        elif left_demand.any():
+            raise ValueError("The allocation leaves demand unmet.")
+
+        parent = list(range(n_rows + n_cols))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        basis = []
+        for i, j, amount in cells:
+            a, b = find(i), find(n_rows + j)
+            if a == b:
+                if amount > 0:
+                    raise ValueError("The allocation is not a basic solution (it contains a cycle).")
+                continue  # Redundant degenerate cell
+            parent[a] = b
+            basis.append((i, j, amount))
+
+        # Join the remaining components through zero cells, components with a column first
+        components = {}
+        for node in range(n_rows + n_cols):
+            components.setdefault(find(node), []).append(node)
+        main = find(0)
+        main_col = next((n - n_rows for n in components[main] if n >= n_rows), None)
+        others = sorted((nodes for root, nodes in components.items() if root != main),
+                        key=lambda nodes: nodes[-1] < n_rows)
+        for nodes in others:
+            row = next((n for n in nodes if n < n_rows), None)
+            col = next((n - n_rows for n in nodes if n >= n_rows), None)
+            if col is not None:
+                basis.append((0, col, 0))
+                if main_col is None:
+                    main_col = col
+            else:
+                basis.append((row, main_col, 0))
+        return basis
+
+    def _build_tree(self, cells):
+        n_rows, n = self.n_rows, self.n_rows + self.n_cols
+        adjacency = [[] for _ in range(n)]
+        for i, j, amount in cells:
+            adjacency[i].append((n_rows + j, amount))
+            adjacency[n_rows + j].append((i, amount))
+
+        self.parent = [-1] * n
+        self.depth = [0] * n
+        self.flow = [0] * n  # Flow on the edge between a node and its parent
+        self.children = [set() for _ in range(n)]
+        self.u = np.zeros(n_rows, dtype=np.result_type(self.Cjk.dtype, np.int64))
+        self.v = np.zeros(self.n_cols, dtype=self.u.dtype)
+
+        stack = [0]
+        seen = [False] * n
+        seen[0] = True
+        while stack:
+            node = stack.pop()
+            for other, amount in adjacency[node]:
+                if seen[other]:
+                    continue
+                seen[other] = True
+                self.parent[other] = node
+                self.depth[other] = self.depth[node] + 1
+                self.flow[other] = amount
+                self.children[node].add(other)
+                i, j = self._cell(other)
+                if other < n_rows:
+                    self.u[i] = self._cost(i, j) - self.v[j]
+                else:
+                    self.v[j] = self._cost(i, j) - self.u[i]
+                stack.append(other)
+
+    # Cell (row, column) of the tree edge between a node and its parent
+    def _cell(self, node):
+        if node < self.n_rows:
+            return node, self.parent[node] - self.n_rows
+        return self.parent[node], node - self.n_rows
+
+    # Most negative reduced cost cell, scanning `block_rows` rows at a time
+    # (partial pricing); None when the basis is optimal.
+    def _entering(self, block_rows=None):
+        d, r = self.d, self.r
+        if block_rows is None or block_rows >= d:
+            block_rows = max(d, 1)
+        blocks = (d + block_rows - 1) // block_rows
+        for step in range(blocks):
+            block = (self._next_block + step) % blocks
+            start = block * block_rows
+            stop = min(start + block_rows, d)
+            reduced = self.Cjk[start:stop] - self.u[start:stop, None] - self.v[None, :r]
+            k = np.argmin(reduced)
+            i, j = divmod(int(k), r)
+            if reduced[i, j] < 0:
+                self._next_block = block
+                return start + i, j, reduced[i, j].item()
+
+        # Virtual cells are priced last, without touching Cjk
+        if self.n_cols > r:
+            reduced = -self.u[:d] - self.v[r]
+            i = int(np.argmin(reduced))
+            if reduced[i] < 0:
+                return i, r, reduced[i].item()
+        if self.n_rows > d:
+            reduced = -self.u[d] - self.v[:r]
+            j = int(np.argmin(reduced))
+            if reduced[j] < 0:
+                return d, j, reduced[j].item()
+        return None
+
+    def _pivot(self, i, j, reduced_cost):
+        n_rows = self.n_rows
+        parent, depth, flow, children = self.parent, self.depth, self.flow, self.children
+
+        # Stepping-stone cycle: the entering cell plus the tree path between its nodes
+        a, b = i, n_rows + j
+        row_side, col_side = [], []
+        while a != b:
+            if depth[a] >= depth[b]:
+                row_side.append(a)
+                a = parent[a]
+            else:
+                col_side.append(b)
+                b = parent[b]
+
+        # Edges alternate -, +, - ... starting next to each end of the entering cell
+        minus = row_side[0::2] + col_side[0::2]
+        leaving = min(minus, key=lambda node: flow[node])
+        theta = flow[leaving]
+        for side in (row_side, col_side):
+            for k, node in enumerate(side):
+                flow[node] += -theta if k % 2 == 0 else theta
+
+        # Cut the leaving edge and hang its subtree from the entering cell
+        inside, outside = (i, n_rows + j) if leaving in row_side else (n_rows + j, i)
+        path = [inside]
+        while path[-1] != leaving:
+            path.append(parent[path[-1]])
+        children[parent[leaving]].discard(leaving)
+        for k in range(len(path) - 1, 0, -1):
+            child, node = path[k - 1], path[k]
+            children[node].discard(child)
+            children[child].add(node)
+            parent[node] = child
+            flow[node] = flow[child]
+        parent[inside] = outside
+        flow[inside] = theta
+        children[outside].add(inside)
+
+        # Shift the potentials of the moved subtree and refresh its depths
+        shift = reduced_cost if inside < n_rows else -reduced_cost
+        depth[inside] = depth[outside] + 1
+        stack = [inside]
+        while stack:
+            node = stack.pop()
+            if node < n_rows:
+                self.u[node] += shift
+            else:
+                self.v[node - n_rows] -= shift
+            for child in children[node]:
+                depth[child] = depth[node] + 1
+                stack.append(child)
+        self.pivots += 1
+        return theta
+
+    # Pivot until no cell has a negative reduced cost; returns the number of pivots.
+    # A Probe gets the 'pricing' and 'pivot' times and one trace step per pivot.
+    def optimize(self, max_pivots=None, block_rows=None, probe=None):
+        first = self.pivots
+        if probe is not None:
+            start = probe.clock()
+        while max_pivots is None or self.pivots - first < max_pivots:
+            entering = self._entering(block_rows)
+            if probe is not None:
+                start = probe.add_time('pricing', start)
+            if entering is None:
+                break
+            theta = self._pivot(*entering)
+            if probe is not None:
+                start = probe.add_time('pivot', start)
+                probe.count('pivots')
+                probe.record(self.pivots, entering[0], entering[1], theta, entering[2])
+        return self.pivots - first
+
+    # Basic cells of the current solution. What the virtual row or column carries is
+    # reported as the allocation's `unmet` or `unshipped` amounts.
+    def allocation(self):
+        cells = []
+        unshipped = np.zeros(self.d, dtype=np.int64) if self.n_cols > self.r else None
+        unmet = np.zeros(self.r, dtype=np.int64) if self.n_rows > self.d else None
+        for node in range(self.n_rows + self.n_cols):
+            if self.parent[node] != -1:
+                i, j = self._cell(node)
+                if j == self.r:
+                    unshipped[i] += self.flow[node]
+                elif i == self.d:
+                    unmet[j] += self.flow[node]
+                else:
+                    cells.append((i, j, self.flow[node]))
+        rows, cols, amounts = zip(*cells) if cells else ((), (), ())
+        return Allocation(rows, cols, amounts, (self.d, self.r), unshipped, unmet)
+
+    def cost(self):
+        return self.allocation().cost(self.Cjk)
+
+
+# Improve an initial basic feasible solution to the transportation optimum.
+# Returns (cost, allocation, pivots).
+def modi(SCj, Dk, Cjk, allocation, max_pivots=None, block_rows=None, probe=None):
+    simplex = TransportationSimplex(SCj, Dk, Cjk, allocation)
+    pivots = simplex.optimize(max_pivots, block_rows, probe)
+    return simplex.cost(), simplex.allocation(), pivots
+
+
+# Pivots MODI needs from each initial solution of an instance
+def compare_starts(instance):
+    from transport.min_matrix import minimum_matrix_sorted
+    from transport.nwc import north_west_corner
+    from transport.vogel import vogel_incremental
+
+    starts = {
+        'nwc': north_west_corner,
+        'vogel': vogel_incremental,
+        'min-matrix': minimum_matrix_sorted,
+    }
+    report = {}
+    for name, start in starts.items():
+        initial_cost, allocation, _ = start(instance.SCj, instance.Dk, instance.Cjk)
+        cost, _, pivots = modi(instance.SCj, instance.Dk, instance.Cjk, allocation)
+        report[name] = (initial_cost, cost, pivots)
+    return report
+
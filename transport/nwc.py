@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+
+from transport.allocation import Allocation
+from transport.balance import balance, split_dummy
+
+
+# North-West Corner Method implementation
+# perf_counter, unlike time.time, resolves the sub-millisecond solves
+# `solved` tells whether the whole demand was met from real depots
+def north_west_corner_method(d, r, SCj, Dk, Cjk, probe=None, dummy=False):
+    start_time = time.perf_counter()
+    cost, allocation, iterations = north_west_corner(SCj, Dk, Cjk, probe, dummy)
+    end_time = time.perf_counter()
+
+    running_time = end_time - start_time
+    solved = int(np.sum(allocation.amounts)) == int(np.sum(Dk))
+
+    return cost, iterations, running_time, solved
+
+
+# Vectorized North-West Corner staircase.
+# Every cell of the staircase ends with a move down (its row is exhausted, at a
+# cumulative supply breakpoint) or a move right (its column is exhausted, at a
+# cumulative demand breakpoint). Merging the two breakpoint lists gives all the basic
+# cells at once: O(d + r) memory and no Python loop. On ties the row moves first,
+# matching the classic loop, so degenerate zero cells are kept in the basis.
+# Returns (cost, allocation, iterations) with at most d + r - 1 cells.
+# With a Probe the breakpoint merge is timed as 'selection' and building the cells
+# and their cost as 'allocation'.
+# With `dummy=True` an unbalanced instance is closed by a virtual zero-cost line (see
+# transport.balance): the staircase simply runs on the balanced vectors, ending in the
+# dummy column or row, and its cells there come back as unshipped or unmet amounts.
+def north_west_corner(SCj, Dk, Cjk, probe=None, dummy=False):
+    d, r = len(SCj), len(Dk)
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.asarray(SCj, dtype=np.int64)
+        demand = np.asarray(Dk, dtype=np.int64)
+    n_rows, n_cols = len(supply), len(demand)
+    if d == 0 or r == 0:
+        return 0, Allocation([], [], [], (d, r)), 0
+    if probe is not None:
+        start = probe.clock()
+
+    positions = np.concatenate((np.cumsum(supply), np.cumsum(demand)))
+    is_right = np.zeros(n_rows + n_cols, dtype=bool)
+    is_right[n_rows:] = True
+    order = np.lexsort((is_right, positions))
+
+    # The walk leaves the table with the first move out of the last row or column
+    is_last = np.zeros(n_rows + n_cols, dtype=bool)
+    is_last[[n_rows - 1, n_rows + n_cols - 1]] = True
+    order = order[:np.argmax(is_last[order]) + 1]
+    if probe is not None:
+        start = probe.add_time('selection', start)
+
+    moves_right = is_right[order]
+    cols = np.cumsum(moves_right) - moves_right
+    rows = np.arange(len(order)) - cols
+    amounts = np.diff(positions[order], prepend=0)
+
+    if dummy:
+        allocation = split_dummy(rows, cols, amounts, (d, r))
+    else:
+        allocation = Allocation(rows, cols, amounts, (d, r))
+    cost = allocation.cost(Cjk)
+    if probe is not None:
+        probe.add_time('allocation', start)
+        probe.count('cells', len(allocation))
+        if probe.trace is not None:
+            for step, (i, j, amount) in enumerate(zip(rows.tolist(), cols.tolist(), amounts.tolist()), 1):
+                probe.record(step, i, j, amount)
+    return cost, allocation, len(order)
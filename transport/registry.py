@@ -0,0 +1,99 @@
+import numpy as np
+
+from transport.min_matrix import minimum_matrix_method
+from transport.modi import modi
+from transport.nwc import north_west_corner
+from transport.vogel import vogel_method
+
+
+# Initial solvers take an Instance, an optional Probe and the `dummy` flag (close an
+# unbalanced instance with a virtual zero-cost line, see transport.balance) and return
+# (cost, allocation, iterations). Each keeps the cost definition of its original
+# script: min-matrix adds the Fjk of the routes used, NWC and Vogel report the Cjk
+# cost only.
+def _solve_nwc(instance, probe=None, dummy=False):
+    return north_west_corner(instance.SCj, instance.Dk, instance.Cjk, probe, dummy)
+
+
+def _solve_vogel(instance, probe=None, dummy=False):
+    Fj = instance.Fj if instance.Fj is not None else np.zeros(instance.d, dtype=np.int64)
+    return vogel_method(instance.d, instance.r, instance.SCj, instance.Dk, instance.Cjk, Fj, probe=probe,
+                        dummy=dummy)
+
+
+def _min_matrix(engine):
+    def solve(instance, probe=None, dummy=False):
+        Fjk = instance.Fjk if instance.Fjk is not None else np.zeros((instance.d, instance.r), dtype=np.int64)
+        return minimum_matrix_method(instance.d, instance.r, instance.SCj, instance.Dk, instance.Cjk, Fjk,
+                                     engine=engine, probe=probe, dummy=dummy)
+    return solve
+
+
+# Optimization stages take an Instance, a starting allocation and an optional Probe
+# and return (cost, allocation, iterations) for the improved solution
+def _stage_modi(instance, allocation, probe=None):
+    return modi(instance.SCj, instance.Dk, instance.Cjk, allocation, probe=probe)
+
+
+SOLVERS = {
+    'nwc': _solve_nwc,
+    'vogel': _solve_vogel,
+    'min-matrix': _min_matrix('sorted'),
+    'min-matrix-fc': _min_matrix('fixed-charge'),
+}
+
+STAGES = {
+    'modi': _stage_modi,
+}
+
+# Solvers whose cost includes the Fjk of the routes used. Stages optimize and report the
+# linear Cjk cost only, so a pipeline starting with one of these adds the fixed charges
+# of its final allocation back, keeping its costs comparable with the solver's own.
+FIXED_CHARGE_SOLVERS = {'min-matrix', 'min-matrix-fc'}
+
+# Separator between the solver and its stages in a pipeline name, e.g. "vogel+modi"
+STAGE_SEPARATOR = '+'
+
+
+def register_solver(name, solver, fixed_charge=False):
+    SOLVERS[name] = solver
+    if fixed_charge:
+        FIXED_CHARGE_SOLVERS.add(name)
+    else:
+        FIXED_CHARGE_SOLVERS.discard(name)
+
+
+def register_stage(name, stage):
+    STAGES[name] = stage
+
+
+# Split "solver+stage+..." into the solver and the stage names, checking all of them
+def parse_pipeline(pipeline):
+    solver_name, *stage_names = pipeline.split(STAGE_SEPARATOR)
+    if solver_name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver_name}'. Choose one of {sorted(SOLVERS)}.")
+    for stage_name in stage_names:
+        if stage_name not in STAGES:
+            raise ValueError(f"Unknown stage '{stage_name}'. Choose one of {sorted(STAGES)}.")
+    return solver_name, stage_names
+
+
+# Run a solver followed by its stages on an instance.
+# Returns (cost, allocation, iterations); iterations are those of the last step run,
+# e.g. the MODI pivots for "vogel+modi". A Probe is shared by every step. The cost
+# follows the solver's definition (see FIXED_CHARGE_SOLVERS) whatever the stages.
+# `dummy=True` lets the solver close an unbalanced instance with a dummy line; the
+# allocation then reports `unshipped` and `unmet` amounts.
+def solve(instance, pipeline, probe=None, dummy=False):
+    solver_name, stage_names = parse_pipeline(pipeline)
+    cost, allocation, iterations = SOLVERS[solver_name](instance, probe, dummy)
+    for stage_name in stage_names:
+        cost, allocation, iterations = STAGES[stage_name](instance, allocation, probe)
+    if stage_names and solver_name in FIXED_CHARGE_SOLVERS and instance.Fjk is not None:
+        cost += allocation.fixed_cost(instance.Fjk)
+    return cost, allocation, iterations
+
+
+# Whether an allocation meets the whole demand of the instance
+def is_solved(instance, allocation):
+    return int(np.sum(allocation.amounts)) == int(np.sum(instance.Dk))
@@ -0,0 +1,93 @@
+import csv
+import os
+
+# Rows buffered before the file is flushed to disk
+FLUSH_EVERY = 100
+
+
+# Append-only CSV writer that streams result rows as instances finish.
+# Rows are flushed (and fsync'ed) every `flush_every` rows, so a crash loses at most
+# one batch. With `resume=True` an existing file is extended instead of replaced.
+class ResultWriter:
+    def __init__(self, output_file, header, flush_every=FLUSH_EVERY, resume=False):
+        self.output_file = output_file
+        self.flush_every = flush_every
+        self._pending = 0
+
+        append = resume and os.path.exists(output_file) and os.path.getsize(output_file) > 0
+        if append:
+            _drop_partial_row(output_file)
+            append = os.path.getsize(output_file) > 0
+        self._file = open(output_file, 'a' if append else 'w', newline='')
+        self._writer = csv.writer(self._file)
+        if not append:
+            self._writer.writerow(header)
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Names of the instances already solved in an existing result file.
+# Rows without a cost (failed instances) are not counted, so they are retried.
+# When the file has a "Solver" column, only rows of `solver` are considered.
+def completed_instances(output_file, solver=None):
+    done = set()
+    if not os.path.exists(output_file):
+        return done
+    with open(output_file, 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return done
+        cost_col = header.index("Cost") if "Cost" in header else None
+        solver_col = header.index("Solver") if "Solver" in header else None
+        for row in reader:
+            if len(row) != len(header):
+                continue  # Partially written row from an interrupted run
+            if cost_col is not None and row[cost_col] == '':
+                continue
+            if solver is not None and solver_col is not None and row[solver_col] != solver:
+                continue
+            done.add(row[0])
+    return done
+
+
+# Cut a trailing row that was only partially written before a crash
+def _drop_partial_row(output_file):
+    with open(output_file, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 1))
+        if f.read(1) == b'\n':
+            return
+        # Scan backwards for the last complete line
+        pos = size
+        while pos > 0:
+            step = min(pos, 4096)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
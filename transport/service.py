@@ -0,0 +1,306 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from transport.cache import load_instance
+from transport.instances import Instance
+from transport.registry import SOLVERS, STAGES, is_solved, solve
+
+# Requests gathered into one pool task, and how long the dispatcher waits for more
+MAX_BATCH = 32
+BATCH_WINDOW = 0.002
+# Instances kept open per worker for requests by path
+INSTANCE_CACHE_SIZE = 256
+# Longest request or response line a stream accepts (asyncio's default is 64 KiB,
+# shorter than an inline instance of a few hundred cells square)
+STREAM_LIMIT = 2 ** 26
+
+
+# Build an Instance from a request: {"path": ".dat file"} or an inline
+# {"instance": {"SCj": [...], "Dk": [...], "Cjk": [[...]], "Fj": ..., "Fjk": ...}}
+def request_instance(request):
+    if 'path' in request:
+        stat = os.stat(request['path'])
+        return _open_instance(request['path'], stat.st_mtime_ns, stat.st_size)
+    data = request['instance']
+    SCj = np.asarray(data['SCj'], dtype=np.int64)
+    Dk = np.asarray(data['Dk'], dtype=np.int64)
+    Cjk = np.asarray(data['Cjk'], dtype=np.int64).reshape(len(SCj), len(Dk))
+    Fj = np.asarray(data['Fj'], dtype=np.int64) if data.get('Fj') is not None else None
+    Fjk = np.asarray(data['Fjk'], dtype=np.int64).reshape(Cjk.shape) if data.get('Fjk') is not None else None
+    return Instance(data.get('name', ''), len(SCj), len(Dk), SCj, Dk, Cjk, Fj=Fj, Fjk=Fjk)
+
+
+# The stamp arguments make an edited file miss the cache
+@lru_cache(maxsize=INSTANCE_CACHE_SIZE)
+def _open_instance(file_path, mtime_ns, size):
+    return load_instance(file_path)
+
+
+# Solve one request; errors are reported in the response instead of raised
+def solve_request(request):
+    response = {'id': None}
+    try:
+        response['id'] = request.get('id')
+        instance = request_instance(request)
+        start_time = time.perf_counter()
+        pipeline = request.get('solver', 'vogel')
+        cost, allocation, iterations = solve(instance, pipeline, dummy=request.get('dummy', False))
+        response.update({
+            'name': instance.name,
+            'cost': int(cost),
+            'iterations': int(iterations),
+            'solved': is_solved(instance, allocation),
+            'running_time': time.perf_counter() - start_time,
+        })
+        if request.get('allocation', True):
+            response['allocation'] = {
+                'rows': allocation.rows.tolist(),
+                'cols': allocation.cols.tolist(),
+                'amounts': allocation.amounts.tolist(),
+            }
+            for key in ('unshipped', 'unmet'):
+                if getattr(allocation, key) is not None:
+                    response['allocation'][key] = getattr(allocation, key).tolist()
+    except Exception as e:
+        response['error'] = f"{type(e).__name__}: {e}"
+    return response
+
+
+# Runs in a worker process: a whole batch goes through a single pickle round trip
+def solve_batch(requests):
+    return [solve_request(request) for request in requests]
+
+
+# Pool initializer: imports are done and every solver has run once before the first
+# real request arrives
+def _warm_worker():
+    warm = Instance('warm', 2, 2, np.array([2, 1]), np.array([1, 1]), np.array([[1, 2], [3, 1]]))
+    for pipeline in list(SOLVERS) + [f"vogel+{stage}" for stage in STAGES]:
+        solve(warm, pipeline)
+
+
+# Long-lived solve service.
+# Requests are queued as they arrive; a dispatcher drains the queue into batches of up
+# to `max_batch` requests (waiting at most `batch_window` seconds for a batch to fill)
+# and hands each batch to a warm process pool. Responses go back to their own callers,
+# so requests on one connection may complete out of order; match them by "id".
+class SolveService:
+    def __init__(self, workers=None, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._executor = None
+        self._queue = None
+        self._dispatcher = None
+        self._pending = set()
+
+    async def start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # Start every worker now instead of on the first requests
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, solve_batch, [])
+                               for _ in range(self.workers)))
+        self._queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, *self._pending, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def solve(self, request):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0 and self._queue.empty():
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), max(timeout, 0)))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._run(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _run(self, batch):
+        requests = [request for request, _ in batch]
+        try:
+            responses = await asyncio.get_running_loop().run_in_executor(self._executor, solve_batch, requests)
+        except Exception as e:
+            responses = [{'id': request.get('id') if isinstance(request, dict) else None,
+                          'error': f"{type(e).__name__}: {e}"} for request in requests]
+        # Every future is resolved, even if the pool returned fewer responses than requests
+        for k, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if k < len(responses):
+                future.set_result(responses[k])
+            else:
+                future.set_exception(RuntimeError("The batch returned no response for this request."))
+
+    # Response to one decoded request line; anything but a JSON object is rejected here,
+    # before it can reach a batch
+    async def _answer(self, request):
+        if not isinstance(request, dict):
+            return {'id': None, 'error': f"A request must be a JSON object, not {type(request).__name__}."}
+        try:
+            return await self.solve(request)
+        except Exception as e:
+            return {'id': request.get('id'), 'error': f"{type(e).__name__}: {e}"}
+
+    # One JSON request per line in, one JSON response per line out.
+    # A line longer than the reader's limit is skipped and answered with an error.
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(response):
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                await respond({'id': None, 'error': f"Invalid JSON: {e}"})
+            else:
+                await respond(await self._answer(request))
+
+        def start(coroutine):
+            task = asyncio.create_task(coroutine)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    start(respond({'id': None, 'error': "Request line longer than the stream limit."}))
+                    continue
+                if not line:
+                    break
+                if line.strip():
+                    start(answer(line))
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+# Drop the rest of an overlong line, up to and including its newline
+async def _skip_line(reader):
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.IncompleteReadError:
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+
+
+# Serve JSON lines on a TCP port or a Unix socket until cancelled
+async def serve(host='127.0.0.1', port=8765, unix_path=None, workers=None,
+                max_batch=MAX_BATCH, batch_window=BATCH_WINDOW, limit=STREAM_LIMIT):
+    async with SolveService(workers, max_batch, batch_window) as service:
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(service.handle, path=unix_path, limit=limit)
+        else:
+            server = await asyncio.start_server(service.handle, host, port, limit=limit)
+        print(f"Serving on {unix_path or f'{host}:{port}'} with {service.workers} workers", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+# Serve JSON lines from stdin to stdout, for use as a subprocess
+async def serve_stdio(workers=None, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW, limit=STREAM_LIMIT):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=limit)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    writer = _StdoutWriter()
+    async with SolveService(workers, max_batch, batch_window) as service:
+        await service.handle(reader, writer)
+
+
+# Minimal stream writer over stdout, which may be a regular file rather than a pipe
+class _StdoutWriter:
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+# Local load generator: `clients` connections each send their share of `requests`
+# one at a time and time every round trip. Returns the latencies in seconds.
+async def load_test(requests, clients=8, host='127.0.0.1', port=8765, unix_path=None, limit=STREAM_LIMIT):
+    latencies = []
+    errors = 0
+
+    async def client(share):
+        nonlocal errors
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        for request in share:
+            start_time = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start_time)
+            errors += 'error' in response
+        writer.close()
+        await writer.wait_closed()
+
+    await asyncio.gather(*(client(requests[k::clients]) for k in range(clients)))
+    if errors:
+        print(f"{errors} requests failed", file=sys.stderr)
+    return latencies
+
+
+# Latency percentiles in milliseconds; only the request count when there are none
+def latency_report(latencies, elapsed=None):
+    latencies = np.asarray(latencies) * 1000
+    if latencies.size == 0:
+        return {'requests': 0}
+    report = {
+        'requests': len(latencies),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+    }
+    if elapsed:
+        report['throughput'] = len(latencies) / elapsed
+    return report
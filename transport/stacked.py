@@ -0,0 +1,128 @@
+import numpy as np
+
+from transport.allocation import StackedAllocation
+
+
+# Stack same-shape instances into (N, d), (N, r) and (N, d, r) arrays.
+# Returns (SCj, Dk, Cjk, Fjk); Fjk is None unless every instance has one.
+def stack_instances(instances):
+    shapes = {(instance.d, instance.r) for instance in instances}
+    if len(shapes) != 1:
+        raise ValueError(f"Instances must share one shape to be stacked, got {sorted(shapes)}.")
+    SCj = np.stack([np.asarray(instance.SCj, dtype=np.int64) for instance in instances])
+    Dk = np.stack([np.asarray(instance.Dk, dtype=np.int64) for instance in instances])
+    Cjk = np.stack([np.asarray(instance.Cjk, dtype=np.int64) for instance in instances])
+    Fjk = None
+    if all(instance.Fjk is not None for instance in instances):
+        Fjk = np.stack([np.asarray(instance.Fjk, dtype=np.int64) for instance in instances])
+    return SCj, Dk, Cjk, Fjk
+
+
+# Positions of a list of instances grouped by (d, r), in their original order
+def group_by_shape(instances):
+    groups = {}
+    for position, instance in enumerate(instances):
+        groups.setdefault((instance.d, instance.r), []).append(position)
+    return groups
+
+
+# North-West Corner on N stacked instances at once.
+# Same breakpoint merge as north_west_corner, with one sort along the last axis for
+# the whole stack: a row breakpoint sorts before a column breakpoint at the same
+# position (key 2 * position + is_right), so ties move down first like the loop.
+# Returns (costs, allocation, iterations), each with one entry per instance.
+def north_west_corner_stacked(SCj, Dk, Cjk):
+    supply = np.asarray(SCj, dtype=np.int64)
+    demand = np.asarray(Dk, dtype=np.int64)
+    d, r = supply.shape[1], demand.shape[1]
+
+    positions = np.concatenate((np.cumsum(supply, axis=1), np.cumsum(demand, axis=1)), axis=1)
+    is_right = np.zeros(d + r, dtype=np.int64)
+    is_right[d:] = 1
+    order = np.argsort(2 * positions + is_right, axis=1, kind='stable')
+
+    # Each walk leaves the table with its first move out of the last row or column
+    is_last = np.zeros(d + r, dtype=bool)
+    is_last[[d - 1, d + r - 1]] = True
+    counts = np.argmax(is_last[order], axis=1) + 1
+    valid = np.arange(d + r) < counts[:, None]
+
+    moves_right = is_right[order]
+    cols = np.cumsum(moves_right, axis=1) - moves_right
+    rows = np.arange(d + r) - cols
+    amounts = np.diff(np.take_along_axis(positions, order, axis=1), axis=1, prepend=0)
+
+    # Padding after the exit points at cell (0, 0) with nothing shipped
+    rows = np.where(valid, rows, 0)
+    cols = np.where(valid, cols, 0)
+    amounts = np.where(valid, amounts, 0)
+
+    allocation = StackedAllocation(rows, cols, amounts, counts, (d, r))
+    return allocation.cost(Cjk), allocation, counts
+
+
+# Minimum matrix method on N stacked instances at once.
+# All N cost matrices are sorted in a single argsort; the sweep then walks the
+# sorted position t = 0, 1, ... of every instance together, so the Python loop runs
+# over the d * r cells of one instance (and stops when every demand is met) rather
+# than over instances. Picks the same cells as minimum_matrix_sorted.
+# Returns (costs, allocation, iterations); costs include Fjk when given.
+def minimum_matrix_stacked(SCj, Dk, Cjk, Fjk=None):
+    supply = np.array(SCj, dtype=np.int64)
+    demand = np.array(Dk, dtype=np.int64)
+    Cjk = np.asarray(Cjk)
+    (N, d), r = supply.shape, demand.shape[1]
+
+    order = np.argsort(Cjk.reshape(N, d * r), axis=1, kind='stable')
+    width = max(d + r - 1, 1)
+    rows = np.zeros((N, width), dtype=np.int64)
+    cols = np.zeros((N, width), dtype=np.int64)
+    amounts = np.zeros((N, width), dtype=np.int64)
+    counts = np.zeros(N, dtype=np.int64)
+    remaining_demand = demand.sum(axis=1)
+
+    for t in range(d * r):
+        open_ = np.flatnonzero(remaining_demand > 0)
+        if open_.size == 0:
+            break
+        i, j = np.divmod(order[open_, t], r)
+        amount = np.minimum(supply[open_, i], demand[open_, j])
+        used = amount > 0
+        n, i, j, amount = open_[used], i[used], j[used], amount[used]
+        rows[n, counts[n]] = i
+        cols[n, counts[n]] = j
+        amounts[n, counts[n]] = amount
+        counts[n] += 1
+        supply[n, i] -= amount
+        demand[n, j] -= amount
+        remaining_demand[n] -= amount
+
+    unsolved = np.flatnonzero(remaining_demand > 0)
+    if unsolved.size:
+        raise ValueError(f"Allocation not possible with current data (instances {unsolved.tolist()}).")
+    allocation = StackedAllocation(rows, cols, amounts, counts, (d, r))
+    costs = allocation.cost(Cjk)
+    if Fjk is not None:
+        costs = costs + allocation.fixed_cost(np.asarray(Fjk))
+    return costs, allocation, counts
+
+
+STACKED_SOLVERS = {
+    'nwc': lambda SCj, Dk, Cjk, Fjk: north_west_corner_stacked(SCj, Dk, Cjk),
+    'min-matrix': minimum_matrix_stacked,
+}
+
+
+# Solve a list of instances shape group by shape group.
+# Returns a list of (cost, allocation, iterations) in the order of `instances`.
+def solve_stacked(solver_name, instances):
+    if solver_name not in STACKED_SOLVERS:
+        raise ValueError(f"No stacked engine for '{solver_name}'. Choose one of {sorted(STACKED_SOLVERS)}.")
+    solver = STACKED_SOLVERS[solver_name]
+    results = [None] * len(instances)
+    for positions in group_by_shape(instances).values():
+        group = [instances[position] for position in positions]
+        costs, allocation, iterations = solver(*stack_instances(group))
+        for k, position in enumerate(positions):
+            results[position] = (costs[k].item(), allocation[k], iterations[k].item())
+    return results
@@ -0,0 +1,357 @@
+import heapq
+
+import numpy as np
+
+from transport.allocation import Allocation
+from transport.balance import balance, split_dummy
+from transport.costs import SparseCosts, sorted_lines
+
+ENGINES = ('incremental', 'vectorized', 'loop')
+
+
+# Vogel's Approximation Method.
+# Returns (total_cost, allocation, iteration_count) with a sparse Allocation.
+# `engine` picks the implementation; all of them make the same choices. Fj is accepted for
+# the FCD instances but, as in the original loop, never enters the cost: the depot
+# fixed charge was only added for depots in use before the first allocation.
+# A SparseCosts Cjk (forbidden routes left out) is only handled by 'incremental'.
+# A Probe (transport.instrument) is filled by 'incremental' and 'vectorized'; the
+# reference loop is not instrumented.
+# With `dummy=True` an unbalanced instance is closed by a virtual zero-cost row or
+# column (see transport.balance) that takes part in the penalties like a padded line
+# would; Cjk itself is only padded by the reference loop.
+def vogel_method(d, r, SCj, Dk, Cjk, Fj, engine='incremental', probe=None, dummy=False):
+    if isinstance(Cjk, SparseCosts) and engine != 'incremental':
+        raise ValueError(f"The '{engine}' Vogel engine needs a dense cost matrix.")
+    if engine == 'incremental':
+        return vogel_incremental(SCj, Dk, Cjk, probe, dummy)
+    if engine == 'vectorized':
+        return vogel_vectorized(SCj, Dk, Cjk, probe, dummy)
+    if engine == 'loop' and dummy:
+        supply, demand = balance(SCj, Dk)
+        padding = ((0, len(supply) - d), (0, len(demand) - r))
+        total_cost, allocation, iteration_count = vogel_loop(len(supply), len(demand), supply, demand,
+                                                             np.pad(Cjk, padding), np.pad(Fj, padding[0]))
+        rows, cols = np.nonzero(allocation)
+        return total_cost, split_dummy(rows, cols, allocation[rows, cols], (d, r)), iteration_count
+    if engine == 'loop':
+        total_cost, allocation, iteration_count = vogel_loop(d, r, SCj, Dk, Cjk, Fj)
+        return total_cost, Allocation.from_dense(allocation), iteration_count
+    raise ValueError(f"Unknown Vogel engine '{engine}'. Choose one of {ENGINES}.")
+
+
+# Reference implementation: recomputes every penalty from scratch each iteration
+def vogel_loop(d, r, SCj, Dk, Cjk, Fj):
+    # Initialize the allocation matrix
+    allocation = np.zeros((d, r), dtype=int)
+    total_cost = 0
+    iteration_count = 0
+
+    # Convert SCj and Dk to numpy arrays for easier manipulation
+    supply = np.array(SCj)
+    demand = np.array(Dk)
+
+    # Add fixed costs to the cost matrix if a deposit is used
+    for j in range(d):
+        if np.any(allocation[j, :] > 0):
+            total_cost += Fj[j]
+
+    while np.sum(supply) > 0 and np.sum(demand) > 0:
+        iteration_count += 1
+
+        # Calculate penalties for rows and columns
+        row_penalties = []
+        for i in range(d):
+            if supply[i] > 0:
+                row = Cjk[i, :]
+                row = row[demand > 0]
+                if len(row) > 1:
+                    sorted_row = np.sort(row)
+                    penalty = sorted_row[1] - sorted_row[0]
+                else:
+                    penalty = 0
+                row_penalties.append(penalty)
+            else:
+                row_penalties.append(-1)
+
+        col_penalties = []
+        for j in range(r):
+            if demand[j] > 0:
+                col = Cjk[:, j]
+                col = col[supply > 0]
+                if len(col) > 1:
+                    sorted_col = np.sort(col)
+                    penalty = sorted_col[1] - sorted_col[0]
+                else:
+                    penalty = 0
+                col_penalties.append(penalty)
+            else:
+                col_penalties.append(-1)
+
+        # Find the maximum penalty
+        max_row_penalty = max(row_penalties)
+        max_col_penalty = max(col_penalties)
+
+        if max_row_penalty >= max_col_penalty:
+            # Allocate in the row with the maximum penalty
+            row_index = row_penalties.index(max_row_penalty)
+            row = Cjk[row_index, :]
+            row = row[demand > 0]
+            min_col_index = np.argmin(row)
+            col_index = np.where(demand > 0)[0][min_col_index]
+        else:
+            # Allocate in the column with the maximum penalty
+            col_index = col_penalties.index(max_col_penalty)
+            col = Cjk[:, col_index]
+            col = col[supply > 0]
+            min_row_index = np.argmin(col)
+            row_index = np.where(supply > 0)[0][min_row_index]
+
+        # Allocate as much as possible
+        amount = min(supply[row_index], demand[col_index])
+        allocation[row_index, col_index] += amount
+        total_cost += amount * Cjk[row_index, col_index]
+        supply[row_index] -= amount
+        demand[col_index] -= amount
+
+    return total_cost, allocation, iteration_count
+
+
+# Batched Vogel engine.
+# Each iteration prices every active row and column in one NumPy expression: the
+# active rows and columns are kept as index arrays, the cost matrix is restricted to
+# them (inactive cells are simply left out rather than set to +inf) and
+# np.partition(..., 1) yields the two smallest entries per axis. Selection is a
+# vectorized argmax/argmin over the same arrays.
+# With `dummy=True` the active dummy row or column is appended to that restricted
+# matrix as zeros; it is always the last active index.
+def vogel_vectorized(SCj, Dk, Cjk, probe=None, dummy=False):
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.array(SCj, dtype=np.int64)
+        demand = np.array(Dk, dtype=np.int64)
+    d, r = len(SCj), len(Dk)
+    active_rows = np.flatnonzero(supply > 0)
+    active_cols = np.flatnonzero(demand > 0)
+
+    rows, cols, amounts = [], [], []
+    total_cost = 0
+    iteration_count = 0
+    while active_rows.size and active_cols.size:
+        iteration_count += 1
+        if probe is not None:
+            start = probe.clock()
+        if dummy:
+            costs = _active_costs(Cjk, active_rows, active_cols)
+        else:
+            costs = Cjk[np.ix_(active_rows, active_cols)]
+        row_penalties = _penalties(costs, axis=1)
+        col_penalties = _penalties(costs, axis=0)
+        if probe is not None:
+            start = probe.add_time('penalty', start)
+            probe.count('cells_scanned', costs.size)
+            probe.count('penalties_recomputed', costs.shape[0] + costs.shape[1])
+
+        best_row = np.argmax(row_penalties)
+        best_col = np.argmax(col_penalties)
+        if row_penalties[best_row] >= col_penalties[best_col]:
+            i = active_rows[best_row]
+            j = active_cols[np.argmin(costs[best_row])]
+            penalty = row_penalties[best_row]
+        else:
+            i = active_rows[np.argmin(costs[:, best_col])]
+            j = active_cols[best_col]
+            penalty = col_penalties[best_col]
+        if probe is not None:
+            start = probe.add_time('selection', start)
+
+        amount = min(supply[i], demand[j])
+        rows.append(i)
+        cols.append(j)
+        amounts.append(amount)
+        if i < d and j < r:
+            total_cost += amount * Cjk[i, j]
+        supply[i] -= amount
+        demand[j] -= amount
+
+        if supply[i] == 0:
+            active_rows = active_rows[active_rows != i]
+        if demand[j] == 0:
+            active_cols = active_cols[active_cols != j]
+        if probe is not None:
+            probe.add_time('allocation', start)
+            probe.record(iteration_count, int(i), int(j), int(amount), penalty.item())
+
+    if dummy:
+        return total_cost, split_dummy(rows, cols, amounts, (d, r)), iteration_count
+    return total_cost, Allocation(rows, cols, amounts, (d, r)), iteration_count
+
+
+# Cjk restricted to the active lines, with zeros for an active dummy row or column
+def _active_costs(Cjk, active_rows, active_cols):
+    d, r = Cjk.shape
+    real_rows = active_rows[active_rows < d]
+    real_cols = active_cols[active_cols < r]
+    costs = np.zeros((active_rows.size, active_cols.size), dtype=Cjk.dtype)
+    costs[:real_rows.size, :real_cols.size] = Cjk[np.ix_(real_rows, real_cols)]
+    return costs
+
+
+# Difference between the two smallest entries along an axis (0 for a single entry)
+def _penalties(costs, axis):
+    if costs.shape[axis] < 2:
+        return np.zeros(costs.shape[1 - axis], dtype=costs.dtype)
+    smallest = np.partition(costs, 1, axis=axis)
+    if axis == 1:
+        return smallest[:, 1] - smallest[:, 0]
+    return smallest[1] - smallest[0]
+
+
+# Incremental Vogel engine.
+# Each row and column is sorted once; per line two pointers track its cheapest and
+# second cheapest entries that are still active. When a row or column is exhausted
+# only the lines whose pointers sat on it are advanced and re-priced (they register
+# in a watch list), and a lazy max-heap hands out the largest penalty. Ties are broken
+# like the loop: rows before columns, then the lowest index.
+# Cjk may be dense (also memory-mapped, sorted a block of lines at a time) or a
+# SparseCosts, in which case each line only holds its allowed routes. A line with no
+# allowed active entry left drops out of the heap.
+# With a Probe, sorting the lines is timed as 'sort', re-pricing lines (including the
+# refreshes triggered by an exhausted line) as 'penalty', heap pops as 'selection'.
+# With `dummy=True` the dummy column (or row) is one more line of zeros, and its
+# zero-cost entry is inserted into every crossing line where a stable sort of the
+# padded line would put it: after the real entries costing 0 or less.
+def vogel_incremental(SCj, Dk, Cjk, probe=None, dummy=False):
+    if dummy:
+        supply, demand = balance(SCj, Dk)
+    else:
+        supply = np.array(SCj, dtype=np.int64)
+        demand = np.array(Dk, dtype=np.int64)
+    d, r = len(supply), len(demand)
+    shippable = min(int(supply.sum()), int(demand.sum()))
+    if probe is not None:
+        start = probe.clock()
+
+    # kind 0 = rows (entries are columns), kind 1 = columns (entries are rows). Every
+    # line keeps its entries in ascending cost order as a NumPy array (for a dense Cjk a
+    # 32-bit view into the block sort); only SparseCosts lines keep their sorted costs,
+    # dense costs are read back from Cjk when a line is priced.
+    lines = (d, r)
+    sparse = isinstance(Cjk, SparseCosts)
+    orders, costs = ([], []), ([], [])
+    for kind in (0, 1):
+        dummy_other = Cjk.shape[1 - kind] if lines[1 - kind] > Cjk.shape[1 - kind] else None
+        for others, line_costs in sorted_lines(Cjk, kind):
+            if dummy_other is not None:
+                position = np.searchsorted(line_costs, 0, side='right')
+                others = np.insert(others, position, dummy_other)
+                line_costs = np.insert(line_costs, position, 0)
+            orders[kind].append(others)
+            costs[kind].append(line_costs if sparse else None)
+        if lines[kind] > Cjk.shape[kind]:
+            orders[kind].append(np.arange(lines[1 - kind]))
+            costs[kind].append(np.zeros(lines[1 - kind], dtype=np.int64) if sparse else None)
+
+    # Cost of the entry at position p of a line; the dummy line and its entries cost 0
+    def cost(kind, line, p):
+        if costs[kind][line] is not None:
+            return costs[kind][line][p].item()
+        other = orders[kind][line][p]
+        i, j = (line, other) if kind == 0 else (other, line)
+        if i >= Cjk.shape[0] or j >= Cjk.shape[1]:
+            return 0
+        return Cjk[i, j].item()
+
+    active = ((supply > 0).tolist(), (demand > 0).tolist())
+    remaining = [sum(active[0]), sum(active[1])]
+    first = ([-1] * d, [-1] * r)
+    second = ([-1] * d, [-1] * r)
+    version = ([0] * d, [0] * r)
+    watchers = ([[] for _ in range(d)], [[] for _ in range(r)])
+    heap = []
+
+    # Move the pointers of a line past exhausted entries and push its new penalty
+    def refresh(kind, line):
+        order = orders[kind][line]
+        other_active = active[1 - kind]
+        n = len(order)
+        p = p_start = max(first[kind][line], 0)
+        while p < n and not other_active[order[p]]:
+            p += 1
+        q = q_start = max(second[kind][line], p + 1)
+        while q < n and not other_active[order[q]]:
+            q += 1
+        if p < n and p != first[kind][line]:
+            watchers[1 - kind][order[p]].append(line)
+        if q < n and q != second[kind][line]:
+            watchers[1 - kind][order[q]].append(line)
+        if probe is not None:
+            probe.count('cells_scanned', p - p_start + q - q_start)
+            probe.count('penalties_recomputed')
+        first[kind][line] = p
+        second[kind][line] = q
+
+        version[kind][line] += 1
+        if p == n:
+            return  # No allowed route left on this line
+        penalty = cost(kind, line, q) - cost(kind, line, p) if q < n else 0
+        heapq.heappush(heap, (-penalty, kind, line, version[kind][line]))
+
+    def exhaust(kind, line):
+        active[kind][line] = False
+        remaining[kind] -= 1
+        for other in watchers[kind][line]:
+            if active[1 - kind][other]:
+                refresh(1 - kind, other)
+        watchers[kind][line] = []
+
+    if probe is not None:
+        start = probe.add_time('sort', start)
+    for kind in (0, 1):
+        for line in range(lines[kind]):
+            if active[kind][line]:
+                refresh(kind, line)
+    if probe is not None:
+        start = probe.add_time('penalty', start)
+
+    rows, cols, amounts = [], [], []
+    total_cost = 0
+    iteration_count = 0
+    while remaining[0] and remaining[1] and heap:
+        key, kind, line, stamp = heapq.heappop(heap)
+        if not active[kind][line] or stamp != version[kind][line]:
+            if probe is not None:
+                probe.count('stale_pops')
+            continue  # Stale entry
+        iteration_count += 1
+        if probe is not None:
+            start = probe.add_time('selection', start)
+
+        p = first[kind][line]
+        other = orders[kind][line][p]
+        i, j = (line, other) if kind == 0 else (other, line)
+        i, j = int(i), int(j)
+        amount = min(supply[i], demand[j])
+        rows.append(i)
+        cols.append(j)
+        amounts.append(amount)
+        total_cost += amount * cost(kind, line, p)
+        supply[i] -= amount
+        demand[j] -= amount
+        if probe is not None:
+            start = probe.add_time('allocation', start)
+            probe.record(iteration_count, i, j, int(amount), -key)
+
+        if supply[i] == 0:
+            exhaust(0, i)
+        if demand[j] == 0:
+            exhaust(1, j)
+        if probe is not None:
+            start = probe.add_time('penalty', start)
+
+    if sum(amounts) < shippable:
+        raise ValueError("Allocation not possible with current data.")
+    if dummy:
+        return total_cost, split_dummy(rows, cols, amounts, Cjk.shape), iteration_count
+    return total_cost, Allocation(rows, cols, amounts, Cjk.shape), iteration_count
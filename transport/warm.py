@@ -0,0 +1,206 @@
+from collections import deque
+
+import numpy as np
+
+from transport.allocation import Allocation
+from transport.balance import balance
+from transport.instances import Instance
+from transport.min_matrix import minimum_matrix_sorted
+from transport.modi import modi
+
+
+# Copy of an instance with a few values changed.
+# `supply` and `demand` map a depot or retailer index to its new value, `costs` is an
+# iterable of (i, j, new Cjk) triples. Only the changed arrays are copied.
+def apply_delta(instance, supply=None, demand=None, costs=None):
+    SCj, Dk, Cjk = instance.SCj, instance.Dk, instance.Cjk
+    if supply:
+        SCj = np.array(SCj, dtype=np.int64)
+        SCj[list(supply)] = list(supply.values())
+    if demand:
+        Dk = np.array(Dk, dtype=np.int64)
+        Dk[list(demand)] = list(demand.values())
+    if costs:
+        rows, cols, values = zip(*costs)
+        Cjk = np.array(Cjk)
+        Cjk[list(rows), list(cols)] = values
+    return Instance(instance.name, instance.d, instance.r, SCj, Dk, Cjk, Fj=instance.Fj, Fjk=instance.Fjk)
+
+
+# Re-solve an instance that changed slightly since `previous` was computed.
+# `previous` is the allocation of an earlier MODI solve; its cells, degenerate zero
+# cells included, are the old basis. The basis is repaired for the new supply and
+# demand (see repair) and MODI continues from it instead of from a fresh NWC or Vogel
+# start. Cost changes alone keep the old basis feasible, so only the pivots they make
+# profitable are run. This pays off for small deltas; once a large share of Cjk has
+# moved, a fresh Vogel start lies closer to the new optimum (see `bench --warm`).
+# Returns (cost, allocation, pivots) like modi.
+def resolve(SCj, Dk, Cjk, previous, max_pivots=None, block_rows=None, probe=None):
+    allocation = repair(SCj, Dk, Cjk, previous)
+    return modi(SCj, Dk, Cjk, allocation, max_pivots, block_rows, probe)
+
+
+# Turn an old basis into a basic feasible solution of the new supply and demand.
+# 1. Rows and columns that now ship more than they have give the excess back from
+#    their most expensive cells.
+# 2. The supply and demand left over (the dummy line of an unbalanced instance
+#    included, see transport.balance) are matched by the minimum matrix method on
+#    the rows and columns concerned only.
+# 3. Old and new cells together may form cycles; each cycle is broken by pushing
+#    flow around it in the direction that does not raise the cost (_basic_cells).
+# The old zero cells are added back where they close no cycle, so an unchanged
+# part of the basis stays as it was.
+def repair(SCj, Dk, Cjk, previous):
+    d, r = len(SCj), len(Dk)
+    if tuple(previous.shape) != (d, r):
+        raise ValueError(f"The previous allocation has shape {tuple(previous.shape)}, the instance {(d, r)}.")
+    supply, demand = balance(SCj, Dk)
+    n_rows = len(supply)
+
+    rows, cols = previous.rows, previous.cols
+    amounts = previous.amounts.copy()
+    unit_costs = np.asarray(Cjk[rows, cols], dtype=np.int64) if len(rows) else np.zeros(0, dtype=np.int64)
+    _give_back(rows, amounts, unit_costs, supply[:d])
+    _give_back(cols, amounts, unit_costs, demand[:r])
+
+    left_supply = supply - np.bincount(rows, amounts, n_rows).astype(np.int64)
+    left_demand = demand - np.bincount(cols, amounts, len(demand)).astype(np.int64)
+    cells = list(zip(rows.tolist(), cols.tolist(), amounts.tolist()))
+    cells += _match_leftover(Cjk, left_supply, left_demand)
+
+    def cost_of(i, j):
+        return Cjk[i, j].item() if i < d and j < r else 0
+
+    kept = _basic_cells(cells, cost_of, n_rows)
+    kept += [(i, j, 0) for i, j in _free_cells(kept, zip(rows.tolist(), cols.tolist()), n_rows)]
+    kept = [(i, j, amount) for i, j, amount in kept if i < d and j < r]
+    rows, cols, amounts = zip(*kept) if kept else ((), (), ())
+    return Allocation(rows, cols, amounts, (d, r))
+
+
+# Lower the amounts of the lines (rows or columns, given per cell by `lines`) that
+# exceed their `limits`, most expensive cells first
+def _give_back(lines, amounts, unit_costs, limits):
+    shipped = np.bincount(lines, amounts, len(limits)).astype(np.int64)
+    for line in np.flatnonzero(shipped > limits).tolist():
+        excess = int(shipped[line] - limits[line])
+        cells = np.flatnonzero(lines == line)
+        for k in cells[np.argsort(-unit_costs[cells], kind='stable')].tolist():
+            amount = min(int(amounts[k]), excess)
+            amounts[k] -= amount
+            excess -= amount
+            if excess == 0:
+                break
+
+
+# Minimum matrix cells matching the leftover supply and demand; the dummy line, if
+# any, is the last row or column and never part of Cjk
+def _match_leftover(Cjk, left_supply, left_demand):
+    d, r = Cjk.shape
+    active_rows = np.flatnonzero(left_supply[:d] > 0)
+    active_cols = np.flatnonzero(left_demand[:r] > 0)
+    cells = []
+    if active_rows.size and active_cols.size:
+        costs = np.asarray(Cjk[np.ix_(active_rows, active_cols)])
+        _, allocation, _ = minimum_matrix_sorted(left_supply[active_rows], left_demand[active_cols], costs,
+                                                 dummy=True)
+        cells += zip(active_rows[allocation.rows].tolist(), active_cols[allocation.cols].tolist(),
+                     allocation.amounts.tolist())
+        left_supply[active_rows] -= np.bincount(allocation.rows, allocation.amounts, active_rows.size).astype(np.int64)
+        left_demand[active_cols] -= np.bincount(allocation.cols, allocation.amounts, active_cols.size).astype(np.int64)
+    # What is still left goes to or comes from the dummy line
+    if len(left_demand) > r and left_demand[r] > 0:
+        cells += [(i, r, amount) for i, amount in enumerate(left_supply.tolist()) if amount > 0]
+    if len(left_supply) > d and left_supply[d] > 0:
+        cells += [(d, j, amount) for j, amount in enumerate(left_demand.tolist()) if amount > 0]
+    return cells
+
+
+# Positive cells turned into a forest over the row nodes 0..n_rows-1 and the column
+# nodes after them. A cell closing a cycle pushes flow around the cycle: forward
+# (the cell grows) if that does not raise the cost, backward otherwise, until a
+# cell of the cycle runs empty and leaves. Supply and demand totals are unchanged.
+def _basic_cells(cells, cost_of, n_rows):
+    flow = {}
+    neighbours = {}
+    for i, j, amount in cells:
+        if amount == 0:
+            continue
+        if (i, j) in flow:
+            flow[i, j] += amount
+            continue
+        path = _tree_path(neighbours, i, n_rows + j)
+        if path is not None:
+            # Going around the cycle from the new cell: path cells alternate -, +, -, ...
+            cycle = [_cell(a, b, n_rows) for a, b in zip(path, path[1:])]
+            minus, plus = cycle[0::2], cycle[1::2]
+            delta = cost_of(i, j) - sum(cost_of(*cell) for cell in minus) + sum(cost_of(*cell) for cell in plus)
+            if delta <= 0:
+                theta = min(flow[cell] for cell in minus)
+                amount += theta
+            else:
+                theta = -min([amount] + [flow[cell] for cell in plus])
+                amount += theta
+            for cell in minus:
+                flow[cell] -= theta
+            for cell in plus:
+                flow[cell] += theta
+            if amount == 0:
+                continue  # The new cell itself ran empty
+            leaving = next(cell for cell in (minus if delta <= 0 else plus) if flow[cell] == 0)
+            del flow[leaving]
+            neighbours[leaving[0]].discard(n_rows + leaving[1])
+            neighbours[n_rows + leaving[1]].discard(leaving[0])
+        flow[i, j] = amount
+        neighbours.setdefault(i, set()).add(n_rows + j)
+        neighbours.setdefault(n_rows + j, set()).add(i)
+    return [(i, j, amount) for (i, j), amount in flow.items()]
+
+
+# Of the candidate (i, j) cells, those that close no cycle with the basic cells
+def _free_cells(basic, candidates, n_rows):
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in basic:
+        parent[find(i)] = find(n_rows + j)
+    present = {(i, j) for i, j, _ in basic}
+    free = []
+    for i, j in candidates:
+        if (i, j) in present:
+            continue
+        a, b = find(i), find(n_rows + j)
+        if a != b:
+            parent[a] = b
+            free.append((i, j))
+    return free
+
+
+# Nodes on the forest path from `start` to `goal`, or None when they are not connected
+def _tree_path(neighbours, start, goal):
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if node == goal:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = previous[node]
+            return path[::-1]
+        for other in neighbours.get(node, ()):
+            if other not in previous:
+                previous[other] = node
+                queue.append(other)
+    return None
+
+
+# (row, column) of the cell joining a row node and a column node
+def _cell(a, b, n_rows):
+    return (a, b - n_rows) if a < n_rows else (b, a - n_rows)